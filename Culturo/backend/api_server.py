@@ -1,81 +1,200 @@
 # backend/api_server.py
-from flask import Flask, jsonify, request
+from flask import Flask, Response, abort, jsonify, request, stream_with_context
 from flask_cors import CORS
-import json
+import sys
 from pathlib import Path
 
+# 让 "backend" 包可以被导入（直接运行 python backend/api_server.py 时）
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.services.asset_service import resolve_hashed_name
+from backend.services.media_service import media_store
+from backend.services.export_service import CONTENT_TYPES, FORMATS, export_lines, parse_time
+from backend.services.star_service import MAX_LEADERBOARD, MAX_STARS, parse_batch, parse_stars, star_service
+from backend.storage.base import StoreError
+from backend.utils import config
+
 app = Flask(__name__)
 CORS(app)
 
-class StarManager:
-    def __init__(self):
-        # 数据文件放在项目根目录的 data 文件夹中
-        self.project_root = Path(__file__).parent.parent
-        self.data_file = self.project_root / "data" / "stars.json"
-        self.data_file.parent.mkdir(exist_ok=True)
-        self._ensure_default_data()
-    
-    def _ensure_default_data(self):
-        """确保数据文件存在并有默认结构"""
-        if not self.data_file.exists():
-            default_data = {
-                'Hong Kong': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-                'China': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-                'Vietnam': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-            }
-            self._save_data(default_data)
-    
-    def _load_data(self):
-        """加载数据"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"加载数据失败: {e}")
-            return {}
-    
-    def _save_data(self, data):
-        """保存数据"""
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            print(f"保存数据失败: {e}")
-            return False
-    
-    def update_stars(self, region, activity, stars):
-        """更新星星数量"""
-        data = self._load_data()
-        
-        # 确保地区存在
-        if region not in data:
-            data[region] = {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-        
-        # 更新星星数量
-        data[region][activity] = stars
-        
-        success = self._save_data(data)
-        return success
-    
-    def get_stars(self, region=None):
-        """获取星星数据"""
-        data = self._load_data()
-        
-        if region:
-            return data.get(region, {})
-        else:
-            return data
-    
-    def get_total_stars(self, region=None):
-        """获取总星星数量"""
-        data = self._load_data()
-        
-        if region:
-            region_data = data.get(region, {})
-            return sum(region_data.values())
-        else:
-            total = 0
-            for region_data in data.values():
-                total += sum(region_data.values())
-            return total
\ No newline at end of file
+
+def bad_request(message):
+    """返回 400 错误"""
+    return jsonify({'error': message}), 400
+
+
+@app.errorhandler(StoreError)
+def store_unavailable(e):
+    """存储不可用（如进度守护进程下没有排行榜）：返回 JSON 503 而不是 HTML 500"""
+    return jsonify({'error': str(e)}), 503
+
+
+@app.get("/api/health")
+def health():
+    """健康检查"""
+    return jsonify({'status': 'ok'})
+
+
+@app.get("/api/learners/<learner>/progress")
+def overall_progress(learner):
+    """获取学习者的总体进度"""
+    return jsonify(star_service.get_overall_progress(learner=learner))
+
+
+@app.get("/api/learners/<learner>/progress/<region>")
+def region_progress(learner, region):
+    """获取学习者在某个地区的进度"""
+    return jsonify(star_service.get_region_progress(region, learner=learner))
+
+
+@app.put("/api/learners/<learner>/stars/<region>/<activity>")
+def update_stars(learner, region, activity):
+    """更新某个活动的星星数量，请求体: {"stars": 0-3}"""
+    payload = request.get_json(silent=True) or {}
+    stars = parse_stars(payload.get('stars'))
+    if stars is None:
+        return bad_request(f"'stars' must be an integer between 0 and {MAX_STARS}")
+    success = star_service.update_stars(region, activity, stars, learner=learner)
+    return jsonify({'success': success}), (200 if success else 500)
+
+
+@app.delete("/api/learners/<learner>/progress")
+def reset_progress(learner):
+    """重置学习者的所有星星"""
+    success = star_service.reset_all_stars(learner=learner)
+    return jsonify({'success': success}), (200 if success else 500)
+
+
+@app.get("/api/learners/<learner>/bootstrap")
+def page_bootstrap(learner):
+    """地区页面所需的全部数据（一次请求）: ?region=China"""
+    region = request.args.get('region')
+    if not region:
+        return bad_request("'region' query parameter is required")
+    return jsonify(star_service.get_page_bootstrap(region, learner=learner))
+
+
+@app.post("/api/progress/bulk")
+def bulk_progress():
+    """批量获取多个学习者的进度，请求体: {"learners": ["a", "b"]}"""
+    payload = request.get_json(silent=True) or {}
+    learners = payload.get('learners')
+    if not isinstance(learners, list) or not all(isinstance(learner, str) for learner in learners):
+        return bad_request("'learners' must be a list of learner ids")
+    return jsonify({'progress': star_service.get_learners_progress(learners)})
+
+
+@app.post("/api/stars/batch")
+def batch_update():
+    """一次请求批量更新，请求体: {"updates": [{"learner", "region", "activity", "stars"}]}"""
+    payload = request.get_json(silent=True) or {}
+    try:
+        batch = parse_batch(payload.get('updates'))
+    except ValueError as e:
+        return bad_request(str(e))
+    success = star_service.update_many(batch)
+    return jsonify({'success': success, 'count': len(batch)}), (200 if success else 500)
+
+
+@app.get("/api/leaderboard")
+def leaderboard():
+    """排行榜: ?limit=10&region=China 或 ?cohort=5A（按地区或按班级，二选一）"""
+    limit = request.args.get('limit') or '10'
+    region = request.args.get('region')
+    cohort = request.args.get('cohort')
+    # 不使用 type=int：它会把 ?limit=abc 静默变成默认值（与 async_server.py 一致，返回 400）
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_LEADERBOARD:
+        return bad_request(f"'limit' must be an integer between 1 and {MAX_LEADERBOARD}")
+    limit = int(limit)
+    if region and cohort:
+        return bad_request("Use either 'region' or 'cohort', not both")
+    return jsonify(star_service.get_leaderboard(limit, region=region, cohort=cohort))
+
+
+@app.get("/api/learners/<learner>/rank")
+def learner_rank(learner):
+    """学习者的排名和百分位: ?region=China 或 ?cohort=5A"""
+    region = request.args.get('region')
+    cohort = request.args.get('cohort')
+    if region and cohort:
+        return bad_request("Use either 'region' or 'cohort', not both")
+    standing = star_service.get_learner_rank(learner, region=region, cohort=cohort)
+    if standing is None:
+        return jsonify({'error': 'Learner has no ranked progress'}), 404
+    return jsonify(standing)
+
+
+@app.get("/api/export")
+def export_progress():
+    """流式导出进度记录（分块传输，内存占用恒定）: ?format=ndjson|csv&region=&activity=&since=&until="""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return bad_request(f"'format' must be one of: {', '.join(FORMATS)}")
+    try:
+        since = parse_time(request.args.get('since'))
+        until = parse_time(request.args.get('until'))
+    except ValueError:
+        return bad_request("'since' and 'until' must be Unix timestamps or ISO 8601 times")
+    lines = export_lines(fmt, region=request.args.get('region'), activity=request.args.get('activity'),
+                         since=since, until=until)
+    return Response(stream_with_context(lines), content_type=CONTENT_TYPES[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="progress.{fmt}"'})
+
+
+@app.get("/assets/<path:name>")
+def static_asset(name):
+    """按内容哈希命名的静态文件（如 assets/map/China.3f2a1b9c0d.png），可被浏览器永久缓存
+
+    文件内容在进程内只保留一份（大文件使用 mmap），支持 Range 请求，供音频/视频拖动播放
+    """
+    path = resolve_hashed_name(name)
+    if path is None:
+        abort(404)
+    try:
+        media = media_store.get(path)
+    except OSError:
+        abort(404)
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': f"public, max-age={config.ASSET_MAX_AGE}, immutable",
+        'Access-Control-Allow-Origin': '*',
+        'ETag': f'"{media.digest}"',
+    }
+    if request.if_none_match.contains(media.digest):
+        return Response(status=304, headers=headers)
+
+    start, stop, status = 0, media.size, 200
+    if_range = request.headers.get('If-Range')
+    # 多段 Range 很少见，按完整文件返回
+    if request.range and len(request.range.ranges) == 1 and if_range in (None, headers['ETag']):
+        byte_range = request.range.range_for_length(media.size)
+        if byte_range is None:
+            headers['Content-Range'] = f"bytes */{media.size}"
+            return Response(status=416, headers=headers)
+        (start, stop), status = byte_range, 206
+        headers['Content-Range'] = f"bytes {start}-{stop - 1}/{media.size}"
+    headers['Content-Length'] = str(stop - start)
+    if request.method == 'HEAD':
+        return Response(status=status, mimetype=media.mime, headers=headers)
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    if media.streamed and stop == media.size and file_wrapper:
+        # 视频拖动时浏览器请求 "bytes=N-"：交给服务器的 file_wrapper 直接发送文件（gunicorn 使用 sendfile 零拷贝）
+        f = open(media.path, 'rb')
+        f.seek(start)
+        return Response(file_wrapper(f, config.MEDIA_CHUNK_BYTES), status=status, mimetype=media.mime,
+                        headers=headers, direct_passthrough=True)
+    return Response(media.chunks(start, stop), status=status, mimetype=media.mime, headers=headers)
+
+
+def main():
+    """启动 API 服务器：优先使用 waitress（生产环境 WSGI 服务器），否则使用 Flask 多线程开发服务器"""
+    try:
+        from waitress import serve
+    except ImportError:
+        print("waitress is not installed; using Flask's threaded development server")
+        app.run(host=config.API_HOST, port=config.API_PORT, threaded=True)
+    else:
+        serve(app, host=config.API_HOST, port=config.API_PORT, threads=config.API_THREADS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# backend/async_server.py
+"""Asyncio variant of the progress API for many mostly idle keep-alive clients.
+
+It serves the same JSON progress routes as api_server.py; progress exports
+(/api/export) and static files (/assets/...) are only served by
+api_server.py. Each connection is a coroutine, so an idle keep-alive socket
+costs almost nothing. The blocking storage calls run on a bounded pool of
+ASYNC_IO_THREADS threads; with the SQLite backend they share the store's
+connection pool (CULTURO_SQLITE_POOL_SIZE connections). Pipelined reads
+on one connection are processed concurrently (after any earlier write)
+and answered in order.
+
+Run the built-in server with ``python backend/async_server.py``, or serve
+``backend.async_server:asgi_app`` with any ASGI server (e.g. uvicorn).
+"""
+import asyncio
+import functools
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Make the "backend" package importable when run as python backend/async_server.py
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.services.star_service import MAX_LEADERBOARD, MAX_STARS, parse_batch, parse_stars, star_service
+from backend.storage.base import StoreError
+from backend.utils import config
+
+MAX_BODY = 1024 * 1024
+# Only plain decimal digits: int() would also take "-5", "+5" and "1_000"
+CONTENT_LENGTH = re.compile(r'^[0-9]+$')
+STATUS_TEXT = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+COMMON_HEADERS = [
+    ('Content-Type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+]
+
+executor = ThreadPoolExecutor(max_workers=config.ASYNC_IO_THREADS, thread_name_prefix='progress-io')
+
+
+class HttpError(Exception):
+    """Turns into an error response with the given status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a storage call on the bounded I/O pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+# Handlers: (path params, query params, JSON payload) -> (status, body)
+
+async def health(params, query, payload):
+    return 200, {'status': 'ok'}
+
+
+async def overall_progress(params, query, payload):
+    return 200, await run_blocking(star_service.get_overall_progress, learner=params['learner'])
+
+
+async def region_progress(params, query, payload):
+    return 200, await run_blocking(star_service.get_region_progress, params['region'], learner=params['learner'])
+
+
+async def update_stars(params, query, payload):
+    stars = parse_stars((payload or {}).get('stars'))
+    if stars is None:
+        raise HttpError(400, f"'stars' must be an integer between 0 and {MAX_STARS}")
+    success = await run_blocking(star_service.update_stars, params['region'], params['activity'], stars,
+                                 learner=params['learner'])
+    return (200 if success else 500), {'success': success}
+
+
+async def reset_progress(params, query, payload):
+    success = await run_blocking(star_service.reset_all_stars, learner=params['learner'])
+    return (200 if success else 500), {'success': success}
+
+
+async def page_bootstrap(params, query, payload):
+    region = query.get('region', [None])[0]
+    if not region:
+        raise HttpError(400, "'region' query parameter is required")
+    return 200, await run_blocking(star_service.get_page_bootstrap, region, learner=params['learner'])
+
+
+async def bulk_progress(params, query, payload):
+    learners = (payload or {}).get('learners')
+    if not isinstance(learners, list) or not all(isinstance(learner, str) for learner in learners):
+        raise HttpError(400, "'learners' must be a list of learner ids")
+    return 200, {'progress': await run_blocking(star_service.get_learners_progress, learners)}
+
+
+async def batch_update(params, query, payload):
+    try:
+        batch = parse_batch((payload or {}).get('updates'))
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    success = await run_blocking(star_service.update_many, batch)
+    return (200 if success else 500), {'success': success, 'count': len(batch)}
+
+
+def ranking_scope(query):
+    region = query.get('region', [None])[0]
+    cohort = query.get('cohort', [None])[0]
+    if region and cohort:
+        raise HttpError(400, "Use either 'region' or 'cohort', not both")
+    return region, cohort
+
+
+async def leaderboard(params, query, payload):
+    region, cohort = ranking_scope(query)
+    limit = query.get('limit', ['10'])[0]
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_LEADERBOARD:
+        raise HttpError(400, f"'limit' must be an integer between 1 and {MAX_LEADERBOARD}")
+    return 200, await run_blocking(star_service.get_leaderboard, int(limit), region=region, cohort=cohort)
+
+
+async def learner_rank(params, query, payload):
+    region, cohort = ranking_scope(query)
+    standing = await run_blocking(star_service.get_learner_rank, params['learner'], region=region, cohort=cohort)
+    if standing is None:
+        raise HttpError(404, 'Learner has no ranked progress')
+    return 200, standing
+
+
+LEARNER = r'/api/learners/(?P<learner>[^/]+)'
+ROUTES = [(method, re.compile(pattern), handler) for method, pattern, handler in [
+    ('GET', r'/api/health', health),
+    ('GET', LEARNER + r'/progress', overall_progress),
+    ('GET', LEARNER + r'/progress/(?P<region>[^/]+)', region_progress),
+    ('PUT', LEARNER + r'/stars/(?P<region>[^/]+)/(?P<activity>[^/]+)', update_stars),
+    ('DELETE', LEARNER + r'/progress', reset_progress),
+    ('GET', LEARNER + r'/bootstrap', page_bootstrap),
+    ('POST', r'/api/progress/bulk', bulk_progress),
+    ('POST', r'/api/stars/batch', batch_update),
+    ('GET', r'/api/leaderboard', leaderboard),
+    ('GET', LEARNER + r'/rank', learner_rank),
+]]
+
+
+async def dispatch(method, target, body):
+    """Route one request; target is the raw (still percent-encoded) path and query"""
+    if method == 'OPTIONS':
+        return 204, None
+    url = urlsplit(target)
+    path_matched = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.fullmatch(url.path)
+        if not match:
+            continue
+        path_matched = True
+        if route_method != method:
+            continue
+        params = {name: unquote(value) for name, value in match.groupdict().items()}
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return 400, {'error': 'Request body must be JSON'}
+        try:
+            return await handler(params, parse_qs(url.query), payload)
+        except HttpError as e:
+            return e.status, {'error': e.message}
+        except StoreError as e:
+            # e.g. leaderboards under the progress daemon, or the daemon being down
+            return 503, {'error': str(e)}
+        except Exception as e:
+            print(f"Request {method} {url.path} failed: {e}")
+            return 500, {'error': 'Internal server error'}
+    if path_matched:
+        return 405, {'error': 'Method not allowed'}
+    return 404, {'error': 'Not found'}
+
+
+def encode_response(status, body, keep_alive):
+    data = b'' if body is None else json.dumps(body, ensure_ascii=False).encode('utf-8')
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in COMMON_HEADERS]
+    lines.append(f"Content-Length: {len(data)}")
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data
+
+
+async def read_request(reader):
+    """Read one request: (method, target, body, keep_alive), or None when the client is done"""
+    line = await asyncio.wait_for(reader.readline(), timeout=config.ASYNC_IDLE_TIMEOUT)
+    if not line:
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise HttpError(400, 'Malformed request line')
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), timeout=config.ASYNC_IDLE_TIMEOUT)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise HttpError(400, 'Chunked request bodies are not supported')
+    length = headers.get('content-length') or '0'
+    if not CONTENT_LENGTH.match(length):
+        raise HttpError(400, 'Invalid Content-Length')
+    length = int(length)
+    if length > MAX_BODY:
+        raise HttpError(413, 'Request body too large')
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method, target, body, keep_alive
+
+
+async def handle_connection(reader, writer):
+    """Serve one keep-alive connection.
+
+    Pipelined reads run concurrently, but never before an earlier write on the
+    same connection has finished, and a write waits for everything before it.
+    Responses are always sent in request order.
+    """
+    responses = asyncio.Queue(maxsize=config.ASYNC_MAX_PIPELINE)
+    last_write = None
+    reads_since_write = []
+
+    async def write_responses():
+        connected = True
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            task, keep_alive = item
+            status, body = await task
+            if not connected:
+                continue
+            try:
+                writer.write(encode_response(status, body, keep_alive))
+                await writer.drain()
+            except ConnectionError:
+                connected = False
+            if not keep_alive:
+                connected = False
+
+    async def error(status, message):
+        return status, {'error': message}
+
+    async def dispatch_after(earlier, method, target, body):
+        await asyncio.gather(*earlier, return_exceptions=True)
+        return await dispatch(method, target, body)
+
+    writer_task = asyncio.create_task(write_responses())
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            except HttpError as e:
+                await responses.put((asyncio.create_task(error(e.status, e.message)), False))
+                break
+            except ValueError:
+                # e.g. a request or header line longer than the stream's limit
+                await responses.put((asyncio.create_task(error(400, 'Malformed request')), False))
+                break
+            if request is None:
+                break
+            method, target, body, keep_alive = request
+            earlier = [last_write] if last_write else []
+            if method in ('GET', 'OPTIONS'):
+                task = asyncio.create_task(dispatch_after(earlier, method, target, body))
+                reads_since_write.append(task)
+            else:
+                task = asyncio.create_task(dispatch_after(earlier + reads_since_write, method, target, body))
+                last_write, reads_since_write = task, []
+            await responses.put((task, keep_alive))
+            if not keep_alive:
+                break
+    finally:
+        await responses.put(None)
+        await writer_task
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def asgi_app(scope, receive, send):
+    """ASGI entry point serving the same JSON routes as serve() (e.g. uvicorn backend.async_server:asgi_app)"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY:
+            status, payload = 413, {'error': 'Request body too large'}
+            break
+        if not message.get('more_body'):
+            raw_path = (scope.get('raw_path') or scope['path'].encode('utf-8')).decode('latin-1')
+            query = scope.get('query_string', b'').decode('latin-1')
+            status, payload = await dispatch(scope['method'], raw_path + ('?' + query if query else ''), body)
+            break
+
+    data = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in COMMON_HEADERS]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': data})
+
+
+async def serve():
+    server = await asyncio.start_server(handle_connection, config.API_HOST, config.ASYNC_PORT, backlog=1024)
+    print(f"Async progress API listening on http://{config.API_HOST}:{config.ASYNC_PORT}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
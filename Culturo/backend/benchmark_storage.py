@@ -0,0 +1,148 @@
+# backend/benchmark_storage.py
+"""Microbenchmark of the progress storage backends.
+
+Every backend gets a fresh store in a temporary directory, filled with
+--learners learners. Then reads (get_learner) and writes (set_stars of a
+random learner and cell) are timed at each thread count and shard count:
+
+    python backend/benchmark_storage.py
+    python backend/benchmark_storage.py --backends sqlite,memory --threads 1,8,64 --ops 20000 --indexed
+    python backend/benchmark_storage.py --backends sqlite --threads 8 --shards 1,4,8 --indexed
+"""
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Make the "backend" package importable when run as python backend/benchmark_storage.py
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.storage.aggregates import IndexedStore
+from backend.storage.journal_store import JournalStore
+from backend.storage.json_store import JsonStore
+from backend.storage.memory_store import MemoryStore
+from backend.storage.sharded_store import ShardedStore
+from backend.storage.sqlite_store import SQLiteStore
+from backend.utils import config
+
+CELLS = [(region, activity) for region in config.REGIONS for activity in config.ACTIVITIES]
+
+
+def make_packed(directory):
+    # Imported here so the other backends can be measured without NumPy
+    from backend.storage.packed_store import PackedStore
+    return PackedStore(directory / 'progress.packed', cells=CELLS)
+
+
+BACKENDS = {
+    'memory': lambda directory: MemoryStore(),
+    'json': lambda directory: JsonStore(directory / 'stars.json'),
+    'sqlite': lambda directory: SQLiteStore(directory / 'progress.db'),
+    'journal': lambda directory: JournalStore(directory / 'progress.journal'),
+    'packed': make_packed,
+}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run(store, operation, learners, threads, ops, seconds):
+    """Run ops operations spread over threads, stopping early after seconds; return (ops/sec, p99 ms)"""
+    per_thread = max(1, ops // threads)
+    latencies = [[] for _ in range(threads)]
+    start_line = threading.Barrier(threads + 1)
+
+    def worker(index):
+        rng = random.Random(index)
+        timings = latencies[index]
+        start_line.wait()
+        deadline = time.perf_counter() + seconds
+        for _ in range(per_thread):
+            if time.perf_counter() > deadline:
+                break
+            learner = rng.choice(learners)
+            started = time.perf_counter()
+            if operation == 'read':
+                store.get_learner(learner)
+            else:
+                region, activity = rng.choice(CELLS)
+                store.set_stars(learner, region, activity, rng.randint(0, 3))
+            timings.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_line.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings = sorted(timing for thread_timings in latencies for timing in thread_timings)
+    return len(timings) / elapsed, percentile(timings, 0.99) * 1000
+
+
+def make_store(name, directory, shards):
+    """A fresh store of backend name, split over shards backends in their own subdirectories"""
+    if shards == 1:
+        return BACKENDS[name](directory)
+    parts = []
+    for shard in range(shards):
+        shard_directory = directory / f'shard-{shard}'
+        shard_directory.mkdir()
+        parts.append(BACKENDS[name](shard_directory))
+    return ShardedStore(parts)
+
+
+def benchmark(name, thread_counts, ops, seconds, learner_count, indexed, shards):
+    with tempfile.TemporaryDirectory(prefix=f'culturo-bench-{name}-') as directory:
+        store = make_store(name, Path(directory), shards)
+        if indexed:
+            store = IndexedStore(store)
+        try:
+            learners = [f'learner-{index}' for index in range(learner_count)]
+            store.set_many((learner, region, activity, 1) for learner in learners for region, activity in CELLS[:4])
+            for threads in thread_counts:
+                for operation in ('read', 'write'):
+                    rate, p99 = run(store, operation, learners, threads, ops, seconds)
+                    print(f"{name:<8} {shards:>6} {operation:<6} {threads:>7} {rate:>12,.0f} {p99:>10.3f}", flush=True)
+        finally:
+            store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure ops/sec and p99 latency of the storage backends")
+    parser.add_argument('--backends', default='memory,json,sqlite,journal,packed',
+                        help=f"comma-separated subset of: {', '.join(BACKENDS)}")
+    parser.add_argument('--threads', default='1,8,64', help="comma-separated thread counts")
+    parser.add_argument('--shards', default='1', help="comma-separated shard counts (one file per shard)")
+    parser.add_argument('--ops', type=int, default=5000, help="operations per measurement")
+    parser.add_argument('--seconds', type=float, default=5,
+                        help="stop a measurement early after this long (slow backends)")
+    parser.add_argument('--learners', type=int, default=1000, help="learners stored before measuring")
+    parser.add_argument('--indexed', action='store_true',
+                        help="wrap each backend in IndexedStore, as the app does")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.backends.split(',') if name.strip()]
+    unknown = [name for name in names if name not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(unknown)}")
+    thread_counts = [int(count) for count in args.threads.split(',')]
+    shard_counts = [int(count) for count in args.shards.split(',')]
+
+    print(f"{'backend':<8} {'shards':>6} {'op':<6} {'threads':>7} {'ops/sec':>12} {'p99 ms':>10}")
+    for name in names:
+        for shards in shard_counts:
+            try:
+                benchmark(name, thread_counts, args.ops, args.seconds, args.learners, args.indexed, shards)
+            except ImportError as e:
+                print(f"{name:<8} skipped: {e}")
+                break
+
+
+if __name__ == "__main__":
+    main()
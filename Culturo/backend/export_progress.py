@@ -0,0 +1,40 @@
+# backend/export_progress.py
+"""Export learner progress as NDJSON or CSV without loading it all into memory.
+
+    python backend/export_progress.py --format csv --region China -o china.csv
+    python backend/export_progress.py --since 2026-01-01 --until 2026-02-01 > january.ndjson
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Make the "backend" package importable when run as python backend/export_progress.py
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.services.export_service import FORMATS, export_lines, parse_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream progress records from the star store")
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--region', help="only this region, e.g. 'Hong Kong'")
+    parser.add_argument('--activity', help="only this activity, e.g. 'Food'")
+    parser.add_argument('--since', help="updated at or after (Unix time or ISO 8601, UTC)")
+    parser.add_argument('--until', help="updated before (Unix time or ISO 8601, UTC)")
+    parser.add_argument('-o', '--output', help="file to write (default: standard output)")
+    args = parser.parse_args(argv)
+
+    try:
+        since, until = parse_time(args.since), parse_time(args.until)
+    except ValueError as e:
+        parser.error(f"invalid time: {e}")
+
+    lines = export_lines(args.format, region=args.region, activity=args.activity, since=since, until=until)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as out:
+            out.writelines(lines)
+    else:
+        sys.stdout.writelines(lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,132 @@
-import json
-import os
-from pathlib import Path
+import copy
+
+from ..storage.base import canonical_activity, with_defaults
+from ..storage.factory import get_default_store
+from ..utils.config import DEFAULT_LEARNER
+
+MAX_STARS = 3
+EMPTY_SUMMARY = {'total': 0, 'completed_regions': 0, 'regions': {}}
+
+class ProgressSnapshot:
+    """One learner's stars and totals as of a single read; every answer agrees with the others"""
+    
+    def __init__(self, learner, data, summary, complete=True):
+        self.learner = learner
+        self.data = with_defaults(data)
+        self.summary = summary
+        # False when the read failed and the values are empty defaults
+        self.complete = complete
+    
+    def get_stars(self, region=None):
+        """Star counts of one region, or of all regions"""
+        if region:
+            return self.data.get(region, with_defaults({region: {}})[region])
+        return self.data
+    
+    def get_total_stars(self, region=None):
+        """Total stars in one region, or overall"""
+        if region:
+            return self.summary['regions'].get(region, {}).get('total', 0)
+        return self.summary['total']
+    
+    def get_completed_activities(self, region):
+        """Activities in a region with at least one star"""
+        return self.summary['regions'].get(region, {}).get('completed', 0)
+    
+    def get_completed_regions(self):
+        """Regions with every activity completed"""
+        return self.summary['completed_regions']
 
 class StarModel:
-    def __init__(self):
-        # Place data file in data folder at project root
-        self.project_root = Path(__file__).parent.parent.parent
-        self.data_file = self.project_root / "data" / "stars.json"
-        self.data_file.parent.mkdir(exist_ok=True)
-        self._ensure_default_data()
+    """Star progress of learners on top of a progress store.
+
+    This is the one implementation of load/update/total logic: the Flask and
+    asyncio APIs use it through StarService and the Streamlit pages through
+    StarManager. Failures are passed to report_error (print by default) and
+    answered with empty defaults.
+    """
     
-    def _ensure_default_data(self):
-        """Ensure the data file exists with a default structure"""
-        if not self.data_file.exists():
-            default_data = {
-                'Hong Kong': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-                'China': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-                'Vietnam': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-            }
-            self._save_data(default_data)
+    def __init__(self, store=None, report_error=print):
+        # Progress lives in the shared store (SQLite by default), keyed by learner
+        self.store = store or get_default_store()
+        self.report_error = report_error
     
-    def _load_data(self):
-        """Load data"""
+    def snapshot(self, learner=DEFAULT_LEARNER):
+        """Read a learner's stars and totals once; use this when answering from several values"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data, summary = self.store.snapshot(learner)
         except Exception as e:
-            print(f"Failed to load data: {e}")
-            return {}
+            self.report_error(f"Failed to load star data: {e}")
+            return ProgressSnapshot(learner, {}, copy.deepcopy(EMPTY_SUMMARY), complete=False)
+        return ProgressSnapshot(learner, data, summary)
     
-    def _save_data(self, data):
-        """Save data"""
+    def learner_version(self, learner=DEFAULT_LEARNER):
+        """Token that changes whenever the learner's progress changes; None if the store cannot tell"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            return self.store.learner_version(learner)
+        except Exception:
+            # The snapshot read that follows reports the failure
+            return None
+    
+    def update_stars(self, region, activity, stars, learner=DEFAULT_LEARNER):
+        """Update star count (clamped to 0-3)"""
+        try:
+            self.store.set_stars(learner, region, canonical_activity(activity), min(max(0, stars), MAX_STARS))
             return True
         except Exception as e:
-            print(f"Failed to save data: {e}")
+            self.report_error(f"Failed to save star data: {e}")
             return False
     
-    def update_stars(self, region, activity, stars):
-        """Update star count"""
-        data = self._load_data()
-        
-        # Ensure region exists
-        if region not in data:
-            data[region] = {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-        
-        # Update star count
-        data[region][activity] = stars
-        
-        success = self._save_data(data)
-        return success
+    def update_many(self, updates):
+        """Update several (learner, region, activity, stars) entries in one write"""
+        try:
+            self.store.set_many([(learner, region, canonical_activity(activity), min(max(0, stars), MAX_STARS))
+                                 for learner, region, activity, stars in updates])
+            return True
+        except Exception as e:
+            self.report_error(f"Failed to save star data: {e}")
+            return False
     
-    def get_stars(self, region=None):
+    def get_summary(self, learner=DEFAULT_LEARNER):
+        """Get running totals: {'total', 'completed_regions', 'regions': {region: {'total', 'completed'}}}"""
+        try:
+            return self.store.summary(learner)
+        except Exception as e:
+            self.report_error(f"Failed to load star data: {e}")
+            return copy.deepcopy(EMPTY_SUMMARY)
+    
+    def get_stars(self, region=None, learner=DEFAULT_LEARNER):
         """Get star data"""
-        data = self._load_data()
+        try:
+            saved = self.store.get_learner(learner)
+        except Exception as e:
+            self.report_error(f"Failed to load star data: {e}")
+            saved = {}
+        data = with_defaults(saved)
         
         if region:
-            return data.get(region, {})
+            return data.get(region, with_defaults({region: {}})[region])
         else:
             return data
     
-    def get_total_stars(self, region=None):
+    def get_total_stars(self, region=None, learner=DEFAULT_LEARNER):
         """Get total star count"""
-        data = self._load_data()
+        summary = self.get_summary(learner)
         
         if region:
-            region_data = data.get(region, {})
-            return sum(region_data.values())
+            return summary['regions'].get(region, {}).get('total', 0)
         else:
-            total = 0
-            for region_data in data.values():
-                total += sum(region_data.values())
-            return total
+            return summary['total']
+    
+    def get_completed_activities(self, region, learner=DEFAULT_LEARNER):
+        """Get the number of activities in a region with at least one star"""
+        return self.get_summary(learner)['regions'].get(region, {}).get('completed', 0)
     
-    def reset_stars(self):
+    def reset_stars(self, learner=DEFAULT_LEARNER):
         """Reset all star data"""
-        default_data = {
-            'Hong Kong': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-            'China': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-            'Vietnam': {'Language Imitation': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-        }
-        return self._save_data(default_data)
\ No newline at end of file
+        try:
+            self.store.reset(learner)
+            return True
+        except Exception as e:
+            self.report_error(f"Failed to reset star data: {e}")
+            return False
@@ -0,0 +1,165 @@
+# backend/progress_daemon.py
+"""Local progress daemon: one process owns the store, the others connect over a Unix socket.
+
+Run it once per machine, then start every Streamlit or API process with
+CULTURO_STORAGE=daemon:
+
+    python backend/progress_daemon.py
+
+The daemon itself stores progress with CULTURO_DAEMON_STORAGE (journal by
+default: in memory, with an append-only log on disk). The wire protocol is
+described in backend/storage/daemon_store.py.
+
+Change notifications are pushed without waiting for the receiver. A client
+that stops reading and lets more than MAX_PUSH_BACKLOG bytes pile up is
+disconnected instead of buffered without bound. It reconnects on its next
+call and drops its cache, so it misses nothing.
+"""
+import asyncio
+import itertools
+import os
+import signal
+import sys
+from pathlib import Path
+
+# Make the "backend" package importable when run as python backend/progress_daemon.py
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.storage.daemon_store import HEADER, MAX_FRAME, MAX_SCAN_BATCH, PUSH_ID, decode_frame, encode_frame
+from backend.storage.factory import create_store
+from backend.utils import config
+
+WRITES = {'set_stars', 'set_many', 'reset'}
+# Operations on the connection's open scans: the handler gets the connection's cursors first
+SCANS = {'scan_open', 'scan_next', 'scan_close'}
+# Unsent bytes a client may fall behind by before it is disconnected
+MAX_PUSH_BACKLOG = 1024 * 1024
+
+
+class ProgressDaemon:
+    """Answers store requests in arrival order and tells the other clients what changed"""
+
+    def __init__(self, store):
+        self.store = store
+        self.clients = set()
+        self.ops = {
+            'get_learner': store.get_learner,
+            'summary': store.summary,
+            'set_stars': store.set_stars,
+            'set_many': lambda updates: store.set_many([tuple(update) for update in updates]),
+            'reset': store.reset,
+            'cohort_totals': store.cohort_totals,
+            'scan_open': self.scan_open,
+            'scan_next': self.scan_next,
+            'scan_close': self.scan_close,
+        }
+
+    def execute(self, op, args, cursors):
+        """Run one request; return (status, result)"""
+        handler = self.ops.get(op)
+        if handler is None:
+            return 'error', f"Unknown operation: {op}"
+        if op in SCANS:
+            args = [cursors, *args]
+        try:
+            return 'ok', handler(*args)
+        except Exception as e:
+            return 'error', str(e)
+
+    def scan_open(self, cursors):
+        """Start streaming every record; return the cursor to page through them with scan_next"""
+        cursor = max(cursors, default=0) + 1
+        cursors[cursor] = self.store.iter_records()
+        return cursor
+
+    def scan_next(self, cursors, cursor, count):
+        """[records, done]: up to count more records of an open scan, which is closed once done"""
+        records = cursors.get(cursor)
+        if records is None:
+            raise ValueError(f"Unknown scan cursor: {cursor}")
+        count = max(1, min(count, MAX_SCAN_BATCH))
+        batch = list(itertools.islice(records, count))
+        done = len(batch) < count
+        if done:
+            self.scan_close(cursors, cursor)
+        return [batch, done]
+
+    def scan_close(self, cursors, cursor):
+        records = cursors.pop(cursor, None)
+        if records is not None:
+            records.close()
+
+    def changed(self, learners, origin):
+        """Push invalidations to every client except the one that wrote; drop clients that lag too far"""
+        frames = b''.join(encode_frame([PUSH_ID, 'changed', learner]) for learner in learners)
+        for writer in self.clients:
+            if writer is origin or writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() + len(frames) > MAX_PUSH_BACKLOG:
+                # Its handle_client sees the connection drop and cleans up
+                writer.transport.abort()
+            else:
+                writer.write(frames)
+
+    async def handle_client(self, reader, writer):
+        self.clients.add(writer)
+        # Scans this client has open, closed when it disconnects
+        cursors = {}
+        try:
+            while True:
+                try:
+                    length, = HEADER.unpack(await reader.readexactly(HEADER.size))
+                    if length > MAX_FRAME:
+                        break
+                    call_id, op, args = decode_frame(await reader.readexactly(length))
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    break
+                # Store calls are short (the store is in memory or cached by
+                # IndexedStore), so they run inline, which keeps requests ordered
+                status, result = self.execute(op, args, cursors)
+                writer.write(encode_frame([call_id, status, result]))
+                if status == 'ok' and op in WRITES:
+                    if op == 'set_many':
+                        learners = {update[0] for update in args[0]}
+                    else:
+                        learners = [args[0] if args else None]
+                    self.changed(learners, writer)
+                await writer.drain()
+        finally:
+            self.clients.discard(writer)
+            for cursor in list(cursors):
+                self.scan_close(cursors, cursor)
+            writer.close()
+
+
+async def serve(socket_path):
+    if config.DAEMON_STORAGE == 'daemon':
+        raise SystemExit("CULTURO_DAEMON_STORAGE must name a local backend, not 'daemon'")
+    store = create_store(config.DAEMON_STORAGE)
+    daemon = ProgressDaemon(store)
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+    server = await asyncio.start_unix_server(daemon.handle_client, str(socket_path))
+    os.chmod(socket_path, 0o600)
+    print(f"Progress daemon ({config.DAEMON_STORAGE}) listening on {socket_path}")
+    # Shut down cleanly (closing the store, removing the socket) on SIGTERM too
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        store.close()
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+def main():
+    try:
+        asyncio.run(serve(config.DAEMON_SOCKET))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Content-hashed names for static files, so they can be cached by browsers forever.
+
+A file's public name carries a digest of its content
+(assets/map/China.png -> assets/map/China.3f2a1b9c0d.png): when the file
+changes its URL changes, so responses can be marked immutable.
+"""
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+from ..utils.config import PROJECT_ROOT
+
+# Only files under these directories (relative to the project root) are served
+SERVED_DIRS = ('assets', 'frontend/static')
+DIGEST_LENGTH = 10
+HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<suffix>\.[^./]+)$' % DIGEST_LENGTH)
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def data_digest(data, length=DIGEST_LENGTH):
+    """SHA-256 of some bytes as hex, cut to length (None for the whole digest)"""
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def content_digest(path, length=DIGEST_LENGTH):
+    """SHA-256 of a file as hex, cut to length; cached by (path, mtime, size)"""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        digest = _digests.get(key)
+    if digest is None:
+        # Hashed in blocks: videos can be far larger than is worth holding in memory
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with _digests_lock:
+            _digests[key] = digest
+    return digest[:length]
+
+
+def _already_hashed(path):
+    """True for files whose name already carries their digest, like the built variants"""
+    match = HASHED_NAME.match(path.name)
+    return bool(match) and content_digest(path) == match.group('digest')
+
+
+def hashed_name(path):
+    """Public name of a file under the project root, e.g. assets/map/China.3f2a1b9c0d.png"""
+    path = Path(path).resolve()
+    relative = path.relative_to(PROJECT_ROOT.resolve()).as_posix()
+    if _already_hashed(path):
+        return relative
+    stem, dot, suffix = relative.rpartition('.')
+    if not dot or '/' in suffix:
+        return f"{relative}.{content_digest(path)}"
+    return f"{stem}.{content_digest(path)}.{suffix}"
+
+
+def resolve_hashed_name(name):
+    """Path of the file a hashed name refers to, or None if unknown, outside SERVED_DIRS or stale"""
+    match = HASHED_NAME.match(name)
+    if not match:
+        return None
+    root = PROJECT_ROOT.resolve()
+    for relative in (name, match.group('stem') + match.group('suffix')):
+        path = (root / relative).resolve()
+        inside = any(os.path.commonpath([path, root / directory]) == str(root / directory) for directory in SERVED_DIRS)
+        # An old digest must not be served as immutable with the new content
+        if inside and path.is_file() and content_digest(path) == match.group('digest'):
+            return path
+    return None
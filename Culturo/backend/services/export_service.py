@@ -0,0 +1,95 @@
+"""Stream progress records out of the star store as NDJSON or CSV.
+
+Everything here is a generator over store.iter_records(), so an export of
+any size holds one record (plus one encoded line) in memory at a time.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from ..storage.factory import get_default_store
+
+FORMATS = ('ndjson', 'csv')
+FIELDS = ('learner', 'region', 'activity', 'stars', 'updated_at')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+
+def parse_time(value):
+    """Turn a Unix timestamp or an ISO 8601 date/datetime (UTC unless given) into a timestamp.
+
+    Raises ValueError for anything else.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def format_time(timestamp):
+    """ISO 8601 UTC time of a record, or None for backends that do not record it"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
+
+
+def filter_records(records, region=None, activity=None, since=None, until=None):
+    """Keep records of one region/activity updated in [since, until).
+
+    Records without a time (json and packed backends) are dropped
+    as soon as a time window is given.
+    """
+    for record in records:
+        _, record_region, record_activity, _, updated_at = record
+        if region is not None and record_region != region:
+            continue
+        if activity is not None and record_activity != activity:
+            continue
+        if since is not None or until is not None:
+            if updated_at is None:
+                continue
+            if since is not None and updated_at < since:
+                continue
+            if until is not None and updated_at >= until:
+                continue
+        yield record
+
+
+def ndjson_lines(records):
+    """One compact JSON object per record, newline terminated"""
+    for learner, region, activity, stars, updated_at in records:
+        yield json.dumps({'learner': learner, 'region': region, 'activity': activity,
+                          'stars': stars, 'updated_at': format_time(updated_at)},
+                         ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def csv_lines(records):
+    """A header line, then one CSV line per record"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def line(row):
+        writer.writerow(row)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(FIELDS)
+    for learner, region, activity, stars, updated_at in records:
+        yield line((learner, region, activity, stars, format_time(updated_at) or ''))
+
+
+def export_lines(fmt='ndjson', region=None, activity=None, since=None, until=None, store=None):
+    """Stream the (filtered) progress records of store as text lines in the given format"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (use {' or '.join(FORMATS)})")
+    store = store or get_default_store()
+    records = filter_records(store.iter_records(), region=region, activity=activity, since=since, until=until)
+    return ndjson_lines(records) if fmt == 'ndjson' else csv_lines(records)
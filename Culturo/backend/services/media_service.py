@@ -0,0 +1,148 @@
+"""One shared in-memory copy of each served file, read in byte ranges.
+
+Small files are read into memory once; larger ones are memory-mapped, so
+the operating system's page cache holds the only copy. Every request and
+every learner reads slices of the same buffer.
+
+Files of MEDIA_STREAM_BYTES and more (the videos) are not mapped whole:
+they are read in aligned chunks through one LRU shared by every request,
+whose size bounds the memory used however many learners are watching.
+"""
+import mimetypes
+import mmap
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from ..utils.config import MEDIA_CHUNK_BYTES, MEDIA_CHUNK_CACHE_BYTES, MEDIA_MMAP_BYTES, MEDIA_STREAM_BYTES
+from .asset_service import content_digest
+
+
+class ChunkCache:
+    """Size-bounded LRU of file chunks keyed by (path, version, chunk index)"""
+
+    def __init__(self, max_bytes=MEDIA_CHUNK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._chunks = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        """The cached chunk for key, or load() it and cache the result"""
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                self.hits += 1
+                return chunk
+            self.misses += 1
+        chunk = load()
+        with self._lock:
+            if key not in self._chunks:
+                self._chunks[key] = chunk
+                self._bytes += len(chunk)
+            while self._bytes > self.max_bytes and len(self._chunks) > 1:
+                _, evicted = self._chunks.popitem(last=False)
+                self._bytes -= len(evicted)
+        return chunk
+
+    def stats(self):
+        """Counters for monitoring: hits, misses, chunks held and their bytes"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'chunks': len(self._chunks), 'bytes': self._bytes}
+
+
+class MediaFile:
+    """A file's content (bytes, mmap, or None when streamed) with its size, MIME type and content digest"""
+
+    def __init__(self, path, data, size, digest, version, chunk_cache=None):
+        self.path = path
+        self.data = data
+        self.size = size
+        self.digest = digest
+        self.version = version
+        self.chunk_cache = chunk_cache
+        self.mime = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+    @property
+    def streamed(self):
+        """True when the file is read through the chunk cache instead of held whole"""
+        return self.data is None
+
+    def chunks(self, start=0, stop=None, chunk_size=MEDIA_CHUNK_BYTES):
+        """Yield bytes [start, stop) in chunks, without copying the rest of the file"""
+        stop = self.size if stop is None else min(stop, self.size)
+        if self.streamed:
+            yield from self._cached_chunks(start, stop, chunk_size)
+            return
+        view = memoryview(self.data)
+        try:
+            for offset in range(start, stop, chunk_size):
+                yield bytes(view[offset:min(offset + chunk_size, stop)])
+        finally:
+            view.release()
+
+    def _cached_chunks(self, start, stop, chunk_size):
+        # Chunks are aligned to chunk_size, so a seek only reads the chunks it lands in
+        for index in range(start // chunk_size, (stop - 1) // chunk_size + 1 if stop > start else 0):
+            offset = index * chunk_size
+            chunk = self.chunk_cache.get((self.path, self.version, chunk_size, index),
+                                         lambda offset=offset: self._read(offset, chunk_size))
+            yield chunk[max(start - offset, 0):stop - offset]
+
+    def _read(self, offset, length):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+
+class MediaStore:
+    """Process-wide cache of MediaFile objects keyed by path, reloaded when the file changes"""
+
+    def __init__(self, mmap_threshold=MEDIA_MMAP_BYTES, stream_threshold=MEDIA_STREAM_BYTES, chunk_cache=None):
+        self.mmap_threshold = mmap_threshold
+        self.stream_threshold = stream_threshold
+        self.chunk_cache = chunk_cache or ChunkCache()
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """MediaFile for path; raises OSError if it cannot be read"""
+        path = Path(path)
+        stat = path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and cached.version == stamp:
+                return cached
+        media = MediaFile(path, self._load(path, stat.st_size), stat.st_size, content_digest(path), stamp,
+                          self.chunk_cache)
+        with self._lock:
+            # A response still streaming the old version keeps its own reference
+            self._files[path] = media
+        return media
+
+    def _load(self, path, size):
+        if size >= self.stream_threshold:
+            return None
+        with open(path, 'rb') as f:
+            if size < self.mmap_threshold or size == 0:
+                return f.read()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def stats(self):
+        """Counters for monitoring: files held, bytes in memory, bytes mapped and the chunk cache"""
+        with self._lock:
+            files = list(self._files.values())
+        return {
+            'files': len(files),
+            'memory_bytes': sum(media.size for media in files if isinstance(media.data, bytes)),
+            'mapped_bytes': sum(media.size for media in files if isinstance(media.data, mmap.mmap)),
+            'streamed_files': sum(1 for media in files if media.streamed),
+            'chunk_cache': self.chunk_cache.stats(),
+        }
+
+
+media_store = MediaStore()
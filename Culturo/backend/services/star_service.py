@@ -1,25 +1,57 @@
-from ..models.star_model import StarModel
+from ..models.star_model import MAX_STARS, StarModel
+from ..storage.factory import get_default_leaderboard
+from ..utils.config import DEFAULT_LEARNER
+
+MAX_LEADERBOARD = 100
+
+def parse_stars(value):
+    """Validate a star count sent by a client (integer 0-3); return None if invalid"""
+    if isinstance(value, bool) or not isinstance(value, int):
+        return None
+    return value if 0 <= value <= MAX_STARS else None
+
+def parse_batch(updates):
+    """Turn a client batch [{"learner", "region", "activity", "stars"}] into update tuples.
+    
+    Raises ValueError describing the first invalid entry.
+    """
+    if not isinstance(updates, list):
+        raise ValueError("'updates' must be a list")
+    batch = []
+    for index, update in enumerate(updates):
+        if not isinstance(update, dict):
+            raise ValueError(f"updates[{index}] must be an object")
+        fields = [update.get(key) for key in ('learner', 'region', 'activity')]
+        stars = parse_stars(update.get('stars'))
+        if not all(isinstance(field, str) and field for field in fields) or stars is None:
+            raise ValueError(f"updates[{index}] needs learner, region, activity and stars (0-{MAX_STARS})")
+        batch.append((*fields, stars))
+    return batch
 
 class StarService:
     def __init__(self):
         self.star_model = StarModel()
     
-    def update_stars(self, region, activity, stars):
+    def update_stars(self, region, activity, stars, learner=DEFAULT_LEARNER):
         """Renew star count service"""
-        return self.star_model.update_stars(region, activity, stars)
+        return self.star_model.update_stars(region, activity, stars, learner=learner)
     
-    def get_stars(self, region=None):
+    def get_stars(self, region=None, learner=DEFAULT_LEARNER):
         """Get star data service"""
-        return self.star_model.get_stars(region)
+        return self.star_model.get_stars(region, learner=learner)
     
-    def get_total_stars(self, region=None):
+    def get_total_stars(self, region=None, learner=DEFAULT_LEARNER):
         """Get total star count service"""
-        return self.star_model.get_total_stars(region)
+        return self.star_model.get_total_stars(region, learner=learner)
     
-    def get_region_progress(self, region):
+    def get_region_progress(self, region, learner=DEFAULT_LEARNER):
         """Get region progress service"""
-        stars = self.get_stars(region)
-        total = self.get_total_stars(region)
+        return self._region_progress(self.star_model.snapshot(learner), region)
+    
+    def _region_progress(self, snapshot, region):
+        """Region progress computed from one snapshot"""
+        stars = snapshot.get_stars(region)
+        total = snapshot.get_total_stars(region)
         max_stars = 12  # 4 activities × 3 stars
         
         return {
@@ -30,10 +62,14 @@ class StarService:
             'progress_percentage': (total / max_stars) * 100 if max_stars > 0 else 0
         }
     
-    def get_overall_progress(self):
+    def get_overall_progress(self, learner=DEFAULT_LEARNER):
         """Get overall progress service"""
-        all_stars = self.get_stars()
-        total_stars = self.get_total_stars()
+        return self._overall_progress(self.star_model.snapshot(learner))
+    
+    def _overall_progress(self, snapshot):
+        """Overall progress computed from one snapshot"""
+        all_stars = snapshot.get_stars()
+        total_stars = snapshot.get_total_stars()
         max_total_stars = 36  # 3 regions × 12 stars
         
         return {
@@ -43,9 +79,40 @@ class StarService:
             'progress_percentage': (total_stars / max_total_stars) * 100 if max_total_stars > 0 else 0
         }
     
-    def reset_all_stars(self):
+    def update_many(self, updates):
+        """Apply a batch of (learner, region, activity, stars) updates in one write"""
+        return self.star_model.update_many(updates)
+    
+    def get_learners_progress(self, learners):
+        """Get overall progress of several learners at once"""
+        return {learner: self.get_overall_progress(learner=learner) for learner in learners}
+    
+    def get_page_bootstrap(self, region, learner=DEFAULT_LEARNER):
+        """Everything a region page shows, in one payload"""
+        snapshot = self.star_model.snapshot(learner)
+        return {
+            'learner': learner,
+            'region': self._region_progress(snapshot, region),
+            'overall': self._overall_progress(snapshot),
+            'completed_activities': snapshot.get_completed_activities(region),
+            'completed_regions': snapshot.get_completed_regions()
+        }
+    
+    def get_leaderboard(self, limit=10, region=None, cohort=None):
+        """Top learners overall, in a region, or in a class (learner ids "<class>:<name>")"""
+        return {
+            'region': region,
+            'cohort': cohort,
+            'leaders': get_default_leaderboard().top(limit, region=region, cohort=cohort)
+        }
+    
+    def get_learner_rank(self, learner=DEFAULT_LEARNER, region=None, cohort=None):
+        """Rank and percentile of a learner; None if they have no stars yet"""
+        return get_default_leaderboard().standing(learner, region=region, cohort=cohort)
+    
+    def reset_all_stars(self, learner=DEFAULT_LEARNER):
         """Reset all stars service"""
-        return self.star_model.reset_stars()
+        return self.star_model.reset_stars(learner=learner)
 
 # Create a global service instance
-star_service = StarService()
\ No newline at end of file
+star_service = StarService()
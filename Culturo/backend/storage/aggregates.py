@@ -0,0 +1,192 @@
+"""Running per-learner aggregates kept up to date on every write"""
+import copy
+import itertools
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.config import ACTIVITIES_PER_REGION, INDEX_CACHE_LEARNERS
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, summarize
+from .sharded_store import shard_index
+
+# Calls for one learner are serialised by one of this many locks, picked by learner hash
+LOCK_STRIPES = 64
+
+
+class IndexedStore(ProgressStore):
+    """Wraps a store and maintains each learner's totals incrementally.
+
+    A learner's data and summary are loaded from the wrapped store the first
+    time they are needed; after that every write adjusts the region total,
+    overall total, completed-activity count and completed-region count by the
+    change in that one cell, so summary() never re-sums anything.
+
+    Each cached learner remembers the wrapped store's learner_version() it
+    was loaded at. Reads compare it with the current version and reload the
+    learner when another process has written it since; a write is folded
+    into the cached copy only when the version read with the write shows
+    nobody else wrote in between, and reloads the learner otherwise. At most
+    max_learners learners are cached, the least recently used going first.
+
+    learner_version() answers with a number this process assigns each time
+    a cached learner is loaded or changed, so callers caching what they read
+    (StarManager) can check it against any backend, including the ones that
+    have no version of their own.
+
+    Calls for the same learner run one at a time under a striped lock, held
+    across the wrapped store's I/O; learners on other stripes (and so other
+    shards of a ShardedStore) are read and written in parallel.
+
+    Listeners registered with subscribe() are called after every write with
+    (learner, summary), and with summary None when a learner (or, with
+    learner None too, everybody) is reset.
+    """
+
+    def __init__(self, inner: ProgressStore, max_learners: int = INDEX_CACHE_LEARNERS):
+        self.inner = inner
+        self.max_learners = max_learners
+        self._entries = OrderedDict()
+        self._listeners = []
+        # Guards _entries and _listeners only; never held across I/O
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._sequence = itertools.count(1)
+
+    @contextmanager
+    def _locked(self, learners):
+        """Hold the stripes of learners (every stripe if None), always taken in the same order"""
+        if learners is None:
+            indexes = range(len(self._stripes))
+        else:
+            indexes = sorted({shard_index(learner, len(self._stripes)) for learner in learners})
+        with ExitStack() as stack:
+            for index in indexes:
+                stack.enter_context(self._stripes[index])
+            yield
+
+    def subscribe(self, listener: Callable[[Optional[str], Optional[Dict[str, Any]]], None],
+                  replay: Optional[Callable[[Iterator[StarRecord]], None]] = None) -> None:
+        """Register a write listener; replay(records) first receives the current contents.
+
+        Both happen with every stripe held, so no write falls between the
+        replay and the first notification.
+        """
+        with self._locked(None):
+            if replay is not None:
+                replay(self.inner.iter_records())
+            with self._lock:
+                self._listeners.append(listener)
+
+    def _notify(self, learner, summary):
+        """Tell listeners about a change; the caller holds the learner's stripe"""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(learner, summary)
+
+    def _cached(self, learner):
+        with self._lock:
+            entry = self._entries.get(learner)
+            if entry is not None:
+                self._entries.move_to_end(learner)
+            return entry
+
+    def _load(self, learner):
+        """Read learner from the wrapped store and cache it; the caller holds its stripe"""
+        # Version first: data newer than its version only costs one extra reload later
+        version = self.inner.learner_version(learner)
+        data = self.inner.get_learner(learner)
+        entry = {'data': data, 'summary': summarize(data), 'version': version, 'sequence': next(self._sequence)}
+        with self._lock:
+            self._entries[learner] = entry
+            self._entries.move_to_end(learner)
+            while len(self._entries) > self.max_learners:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _entry(self, learner):
+        """The cached data and summary of learner, reloaded if it changed; the caller holds its stripe"""
+        entry = self._cached(learner)
+        if entry is None or entry['version'] != self.inner.learner_version(learner):
+            entry = self._load(learner)
+        return entry
+
+    def _apply(self, entry, region, activity, stars):
+        """Fold one cell change into the entry's data and summary"""
+        activities = entry['data'].setdefault(region, {})
+        old = activities.get(activity, 0)
+        activities[activity] = stars
+
+        summary = entry['summary']
+        region_summary = summary['regions'].setdefault(region, {'total': 0, 'completed': 0})
+        was_complete = region_summary['completed'] >= ACTIVITIES_PER_REGION
+        region_summary['total'] += stars - old
+        summary['total'] += stars - old
+        if (old > 0) != (stars > 0):
+            region_summary['completed'] += 1 if stars > 0 else -1
+        is_complete = region_summary['completed'] >= ACTIVITIES_PER_REGION
+        if was_complete != is_complete:
+            summary['completed_regions'] += 1 if is_complete else -1
+
+    def get_learner(self, learner: str) -> LearnerData:
+        with self._locked([learner]):
+            return copy.deepcopy(self._entry(learner)['data'])
+
+    def summary(self, learner: str) -> Dict[str, Any]:
+        with self._locked([learner]):
+            return copy.deepcopy(self._entry(learner)['summary'])
+
+    def snapshot(self, learner: str) -> Tuple[LearnerData, Dict[str, Any]]:
+        with self._locked([learner]):
+            entry = self._entry(learner)
+            return copy.deepcopy(entry['data']), copy.deepcopy(entry['summary'])
+
+    def learner_version(self, learner: str) -> int:
+        with self._locked([learner]):
+            return self._entry(learner)['sequence']
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        return self.inner.iter_records()
+
+    def cohort_totals(self) -> Dict[str, Any]:
+        return self.inner.cohort_totals()
+
+    def changed_learners(self, since: float) -> Optional[List[str]]:
+        return self.inner.changed_learners(since)
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        self.set_many([(learner, region, activity, stars)])
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        updates = list(updates)
+        cells = {}
+        for learner, region, activity, stars in updates:
+            cells.setdefault(learner, []).append((region, activity, stars))
+        with self._locked(cells):
+            versions = self.inner.set_many_versioned(updates)
+            for learner, changes in cells.items():
+                entry = self._cached(learner)
+                before, after = versions[learner]
+                if entry is not None and entry['version'] == before:
+                    for region, activity, stars in changes:
+                        self._apply(entry, region, activity, stars)
+                    entry['version'] = after
+                    entry['sequence'] = next(self._sequence)
+                else:
+                    # Not cached, or another process wrote the learner since it was loaded
+                    entry = self._load(learner)
+                self._notify(learner, entry['summary'])
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        with self._locked(None if learner is None else [learner]):
+            self.inner.reset(learner)
+            with self._lock:
+                if learner is None:
+                    self._entries.clear()
+                else:
+                    self._entries.pop(learner, None)
+            self._notify(learner, None)
+
+    def close(self) -> None:
+        self.inner.close()
@@ -0,0 +1,161 @@
+"""Interface shared by all progress storage backends"""
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.config import ACTIVITIES, ACTIVITIES_PER_REGION, ACTIVITY_ALIASES, REGIONS
+
+# learner data layout returned by every backend: {region: {activity: stars}}
+LearnerData = Dict[str, Dict[str, int]]
+
+# one star update: (learner, region, activity, stars)
+StarUpdate = Tuple[str, str, str, int]
+
+# one stored cell: (learner, region, activity, stars, updated_at); updated_at
+# is a Unix timestamp, or None for backends that do not record it
+StarRecord = Tuple[str, str, str, int, Optional[float]]
+
+
+def canonical_activity(activity: str) -> str:
+    """Map an old activity name (e.g. 'Language Imitation') to the current one"""
+    return ACTIVITY_ALIASES.get(activity, activity)
+
+
+def with_defaults(saved: LearnerData) -> LearnerData:
+    """Fill in 0 stars for every known region and activity a learner has not played yet"""
+    data = {region: dict.fromkeys(ACTIVITIES, 0) for region in REGIONS}
+    for region, activities in saved.items():
+        region_data = data.setdefault(region, dict.fromkeys(ACTIVITIES, 0))
+        for activity, stars in activities.items():
+            # Data saved under both names keeps the value of the current name
+            if activity in ACTIVITY_ALIASES and ACTIVITY_ALIASES[activity] in activities:
+                continue
+            region_data[canonical_activity(activity)] = stars
+    return data
+
+
+def summarize(data: LearnerData) -> Dict[str, Any]:
+    """Compute a learner summary from scratch: totals and completed-activity counts.
+
+    An activity counts as completed once it has at least one star, and a
+    region once all ACTIVITIES_PER_REGION activities are completed.
+    """
+    regions = {}
+    for region, activities in data.items():
+        regions[region] = {
+            'total': sum(activities.values()),
+            'completed': sum(1 for stars in activities.values() if stars > 0),
+        }
+    return {
+        'total': sum(region['total'] for region in regions.values()),
+        'completed_regions': sum(1 for region in regions.values() if region['completed'] >= ACTIVITIES_PER_REGION),
+        'regions': regions,
+    }
+
+
+def cohort_totals_from_records(records: Iterable[StarRecord]) -> Dict[str, Any]:
+    """Sum stars over all learners: overall, per region and per (region, activity)"""
+    learners = set()
+    regions = {}
+    activities = {}
+    for learner, region, activity, stars, _ in records:
+        learners.add(learner)
+        regions[region] = regions.get(region, 0) + stars
+        region_activities = activities.setdefault(region, {})
+        region_activities[activity] = region_activities.get(activity, 0) + stars
+    return {
+        'learners': len(learners),
+        'total': sum(regions.values()),
+        'regions': regions,
+        'activities': activities,
+    }
+
+
+def merge_cohort_totals(parts: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine cohort totals of disjoint groups of learners (e.g. shards)"""
+    merged = {'learners': 0, 'total': 0, 'regions': {}, 'activities': {}}
+    for part in parts:
+        merged['learners'] += part['learners']
+        merged['total'] += part['total']
+        for region, stars in part['regions'].items():
+            merged['regions'][region] = merged['regions'].get(region, 0) + stars
+        for region, region_activities in part['activities'].items():
+            merged_activities = merged['activities'].setdefault(region, {})
+            for activity, stars in region_activities.items():
+                merged_activities[activity] = merged_activities.get(activity, 0) + stars
+    return merged
+
+
+class StoreError(Exception):
+    """Raised when a backend cannot read or write progress data"""
+
+
+class ProgressStore:
+    """Stores star counts keyed by (learner, region, activity).
+
+    Backends only persist what has been written; filling in default
+    regions and activities is left to the callers (StarModel, StarManager).
+    """
+
+    def get_learner(self, learner: str) -> LearnerData:
+        """Return all saved star counts for one learner"""
+        raise NotImplementedError
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        """Save the star count of one activity"""
+        raise NotImplementedError
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        """Save several star counts; backends override this to write them in one go"""
+        for learner, region, activity, stars in updates:
+            self.set_stars(learner, region, activity, stars)
+
+    def set_many_versioned(self, updates: Iterable[StarUpdate]) -> Dict[str, Tuple[Any, Any]]:
+        """Like set_many; return {learner: (version before, version after)} read together with the write.
+
+        A caller whose cached copy of a learner has version "before" knows
+        no other process wrote the learner in between, so it can apply the
+        updates to its copy instead of reloading.
+        """
+        updates = list(updates)
+        self.set_many(updates)
+        return {learner: (None, None) for learner, _, _, _ in updates}
+
+    def learner_version(self, learner: str) -> Optional[Hashable]:
+        """Token that changes whenever the learner's stored cells change, in any process.
+
+        None for backends only one process can write (memory, journal,
+        packed), where a cached copy is only changed by the process's own writes.
+        """
+        return None
+
+    def changed_learners(self, since: float) -> Optional[List[str]]:
+        """Learners written or reset at or after since (a Unix time), by any process.
+
+        None means the backend cannot tell which learners changed, only that
+        some may have, and callers must rescan everything. Backends only one
+        process can write return [], as that process sees its own writes.
+        """
+        return []
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        """Delete the progress of one learner, or of everybody if learner is None"""
+        raise NotImplementedError
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        """Yield every stored cell, learner by learner"""
+        raise NotImplementedError
+
+    def cohort_totals(self) -> Dict[str, Any]:
+        """Stars summed over all learners (see cohort_totals_from_records)"""
+        return cohort_totals_from_records(self.iter_records())
+
+    def summary(self, learner: str) -> Dict[str, Any]:
+        """Return {'total', 'completed_regions', 'regions': {region: {'total', 'completed'}}}"""
+        return summarize(self.get_learner(learner))
+
+    def snapshot(self, learner: str) -> Tuple[LearnerData, Dict[str, Any]]:
+        """Return (get_learner, summary) of one learner as of a single read"""
+        data = self.get_learner(learner)
+        return data, summarize(data)
+
+    def close(self) -> None:
+        """Release files and connections held by the backend"""
@@ -0,0 +1,244 @@
+"""Client of the local progress daemon (backend/progress_daemon.py) over a Unix socket.
+
+Frames are a 4-byte big-endian length followed by compact UTF-8 JSON:
+
+    request   [id, op, args]
+    response  [id, "ok", result] or [id, "error", message]
+    push      [0, "changed", learner]   (learner null: everybody was reset)
+
+Any number of requests may be in flight on one connection; the daemon
+answers them in order.
+
+The frames stay JSON rather than a binary encoding such as msgpack. msgpack
+is not a dependency and the standard library has nothing equivalent. A
+frame is typically a few dozen bytes, and the length prefix already spares
+the reader any delimiter scanning, so a binary encoding would save little
+next to the store call each frame stands for.
+
+Records are scanned in pages so no frame grows with the amount of progress:
+"scan_open" returns a cursor, each ["scan_next", cursor, n] returns
+[records, done] with at most n records (MAX_SCAN_BATCH), and "scan_close"
+drops a cursor before it is done. Cursors belong to the connection and are
+closed when it goes away.
+"""
+import copy
+import json
+import socket
+import struct
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, StoreError
+
+HEADER = struct.Struct('>I')
+MAX_FRAME = 64 * 1024 * 1024
+PUSH_ID = 0
+# Records per scan_next page: about 100 KB of JSON
+SCAN_BATCH = 2000
+MAX_SCAN_BATCH = 10000
+
+
+def encode_frame(message) -> bytes:
+    body = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(len(body)) + body
+
+
+def decode_frame(body: bytes):
+    return json.loads(body.decode('utf-8'))
+
+
+def read_frame(stream):
+    """Read one frame from a binary file object; None at end of stream"""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    length, = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise StoreError(f"Progress daemon frame too large: {length} bytes")
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return decode_frame(body)
+
+
+class _Call:
+    """One request waiting for its response"""
+
+    def __init__(self, cache_key=None):
+        self.done = threading.Event()
+        self.ok = False
+        self.result = None
+        self.cache_key = cache_key
+
+
+class DaemonStore(ProgressStore):
+    """Thin client: every call is a request to the daemon, which owns the real store.
+
+    get_learner() and summary() results are cached per learner. The daemon
+    pushes a "changed" message to every other connection after a write, and
+    the reader thread evicts the learner before handling the next frame, so a
+    cached value is never older than the last push received.
+
+    learner_version() is a generation number that goes up whenever cached
+    values are dropped (a push, a write of this process, a reconnect). It is
+    shared by all learners, so it can change when this learner did not, but
+    never stays the same across a change this process was told about.
+    """
+
+    def __init__(self, socket_path, timeout=10.0):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._cache = {}
+        self._calls = {}
+        self._next_id = PUSH_ID + 1
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._sock = None
+
+    def _connect(self):
+        """Return the open connection, connecting (and starting the reader) if needed; caller holds _lock"""
+        if self._sock is None:
+            if not hasattr(socket, 'AF_UNIX'):
+                raise StoreError("The progress daemon needs Unix domain sockets")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                sock.close()
+                raise StoreError(f"Progress daemon is not reachable at {self.socket_path}: {e}")
+            self._sock = sock
+            # Nothing cached before this connection is covered by its pushes
+            self._cache.clear()
+            self._generation += 1
+            threading.Thread(target=self._read_loop, args=(sock,), name='progress-daemon-reader', daemon=True).start()
+        return self._sock
+
+    def _read_loop(self, sock):
+        stream = sock.makefile('rb')
+        try:
+            while True:
+                message = read_frame(stream)
+                if message is None:
+                    break
+                call_id, status, payload = message
+                with self._lock:
+                    if call_id == PUSH_ID:
+                        self._evict(payload)
+                        continue
+                    call = self._calls.pop(call_id, None)
+                    if call is None:
+                        continue
+                    call.ok = status == 'ok'
+                    call.result = payload
+                    if call.ok and call.cache_key is not None:
+                        self._cache[call.cache_key] = payload
+                call.done.set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+            self._disconnected(sock)
+
+    def _disconnected(self, sock):
+        """Fail every waiting call; the next call reconnects"""
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+                self._cache.clear()
+                self._generation += 1
+            calls, self._calls = self._calls, {}
+        sock.close()
+        for call in calls.values():
+            call.result = "Connection to the progress daemon was lost"
+            call.done.set()
+
+    def _evict(self, learner):
+        """Drop cached values of learner (everybody if None); caller holds _lock"""
+        self._generation += 1
+        if learner is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(('learner', learner), None)
+            self._cache.pop(('summary', learner), None)
+
+    def _call(self, op, *args, cache_key=None):
+        with self._lock:
+            if cache_key is not None and cache_key in self._cache:
+                return copy.deepcopy(self._cache[cache_key])
+            sock = self._connect()
+            call_id = self._next_id
+            self._next_id += 1
+            call = self._calls[call_id] = _Call(cache_key)
+        try:
+            with self._send_lock:
+                sock.sendall(encode_frame([call_id, op, list(args)]))
+        except OSError as e:
+            self._disconnected(sock)
+            raise StoreError(f"Progress daemon request failed: {e}")
+        if not call.done.wait(self.timeout):
+            with self._lock:
+                self._calls.pop(call_id, None)
+            raise StoreError(f"Progress daemon did not answer {op} within {self.timeout}s")
+        if not call.ok:
+            raise StoreError(f"Progress daemon {op} failed: {call.result}")
+        return copy.deepcopy(call.result) if cache_key is not None else call.result
+
+    def _written(self, learners):
+        with self._lock:
+            for learner in learners:
+                self._evict(learner)
+
+    def learner_version(self, learner: str) -> int:
+        with self._lock:
+            return self._generation
+
+    def get_learner(self, learner: str) -> LearnerData:
+        return self._call('get_learner', learner, cache_key=('learner', learner))
+
+    def summary(self, learner: str) -> Dict[str, Any]:
+        return self._call('summary', learner, cache_key=('summary', learner))
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        self._call('set_stars', learner, region, activity, stars)
+        self._written([learner])
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        updates = [list(update) for update in updates]
+        self._call('set_many', updates)
+        self._written({learner for learner, _, _, _ in updates})
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        self._call('reset', learner)
+        self._written([learner])
+
+    def iter_records(self, batch=SCAN_BATCH) -> Iterator[StarRecord]:
+        cursor = self._call('scan_open')
+        done = False
+        try:
+            while not done:
+                records, done = self._call('scan_next', cursor, batch)
+                for record in records:
+                    yield tuple(record)
+        finally:
+            if not done:
+                # Abandoned part-way (or failed): free the daemon's cursor if the connection still exists
+                try:
+                    self._call('scan_close', cursor)
+                except StoreError:
+                    pass
+
+    def cohort_totals(self) -> Dict[str, Any]:
+        return self._call('cohort_totals')
+
+    def close(self) -> None:
+        with self._lock:
+            sock, self._sock = self._sock, None
+            self._cache.clear()
+            self._generation += 1
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
@@ -0,0 +1,98 @@
+"""Create progress stores from the backend settings"""
+import threading
+
+from ..utils import config
+from .aggregates import IndexedStore
+from .base import StoreError
+from .daemon_store import DaemonStore
+from .journal_store import JournalStore
+from .json_store import JsonStore
+from .leaderboard import Leaderboard
+from .memory_store import MemoryStore
+from .sharded_store import ShardedStore
+from .sqlite_store import SQLiteStore
+from .write_behind import WriteBehindStore
+
+_default_store = None
+_default_leaderboard = None
+_default_store_lock = threading.Lock()
+
+
+def create_store(backend=None, write_behind=None, shards=None):
+    """Create a new store for the given backend name (defaults to config.STORAGE_BACKEND).
+
+    write_behind is the batching interval in seconds (defaults to
+    config.WRITE_BEHIND_INTERVAL); 0 writes synchronously. shards (defaults
+    to config.SHARDS) splits learners over that many backend instances. The
+    returned store keeps running per-learner totals (see IndexedStore).
+
+    The "daemon" backend is a client of the local progress daemon, which
+    already does all of that; it is returned as is.
+    """
+    backend = backend or config.STORAGE_BACKEND
+    if backend == 'daemon':
+        return DaemonStore(config.DAEMON_SOCKET)
+    if write_behind is None:
+        write_behind = config.WRITE_BEHIND_INTERVAL
+    if shards is None:
+        shards = config.SHARDS
+    if shards > 1:
+        store = ShardedStore([_create_backend(backend, shard) for shard in range(shards)])
+    else:
+        store = _create_backend(backend)
+    if write_behind > 0:
+        store = WriteBehindStore(store, interval=write_behind)
+    return IndexedStore(store)
+
+
+def _shard_path(path, shard):
+    """data/progress.db -> data/progress-3.db for shard 3; unchanged when not sharded"""
+    if shard is None:
+        return path
+    return path.with_name(f"{path.stem}-{shard}{path.suffix}")
+
+
+def _create_backend(backend, shard=None):
+    if backend == 'sqlite':
+        return SQLiteStore(_shard_path(config.SQLITE_PATH, shard), busy_timeout=config.SQLITE_BUSY_TIMEOUT,
+                           pool_size=config.SQLITE_POOL_SIZE)
+    if backend == 'json':
+        return JsonStore(_shard_path(config.JSON_PATH, shard))
+    if backend == 'journal':
+        return JournalStore(_shard_path(config.JOURNAL_PATH, shard),
+                            compact_interval=config.JOURNAL_COMPACT_INTERVAL,
+                            compact_records=config.JOURNAL_COMPACT_RECORDS,
+                            keep_history=config.JOURNAL_KEEP_HISTORY)
+    if backend == 'memory':
+        return MemoryStore()
+    if backend == 'packed':
+        # Imported here so the other backends work without NumPy
+        from .packed_store import PackedStore
+        return PackedStore(_shard_path(config.PACKED_PATH, shard),
+                           cells=[(region, activity) for region in config.REGIONS for activity in config.ACTIVITIES])
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_default_store():
+    """Return the process-wide store shared by StarModel and StarManager"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = create_store()
+    return _default_store
+
+
+def get_default_leaderboard():
+    """Return the process-wide leaderboard, following writes to the default store"""
+    global _default_leaderboard
+    if _default_leaderboard is None:
+        store = get_default_store()
+        if not isinstance(store, IndexedStore):
+            raise StoreError("Leaderboards need a local storage backend, not the progress daemon")
+        with _default_store_lock:
+            if _default_leaderboard is None:
+                leaderboard = Leaderboard()
+                leaderboard.attach(store)
+                _default_leaderboard = leaderboard
+    return _default_leaderboard
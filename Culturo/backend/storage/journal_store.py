@@ -0,0 +1,286 @@
+"""Progress storage as an append-only journal of fixed-size records plus periodic snapshots.
+
+Every update appends one 128-byte record to the journal, so the cost of a
+write does not depend on how much progress is stored. On start the state is
+rebuilt from the last snapshot plus the records after it, and a background
+thread periodically rolls the journal into a new snapshot. Rolled journal
+segments are kept (unless keep_history is off) as an audit trail.
+
+Each cell is kept in memory and in the snapshot as [stars, time of the last
+write], so exports can filter by update time. Snapshots written before
+times were kept hold plain star counts; their cells load with no time.
+
+Resetting one learner and resetting everyone are distinct record types, so
+an empty learner id is never mistaken for "all learners" on replay. If a
+snapshot write fails, the rolling segment it was made from is kept and the
+next compaction appends the journal to it instead of replacing it.
+"""
+import copy
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, StoreError
+from .locks import fcntl
+
+# op, time, stars, learner, region, activity, padding -> 128 bytes
+RECORD = struct.Struct('<cdB64s24s24s6x')
+OP_SET = b'S'
+OP_RESET = b'R'
+OP_RESET_ALL = b'A'
+OPS = {OP_SET: 'set', OP_RESET: 'reset', OP_RESET_ALL: 'reset_all'}
+
+
+def _encode_name(value, size, field):
+    raw = value.encode('utf-8')
+    if len(raw) > size:
+        raise ValueError(f"{field} '{value}' is too long for a journal record ({size} bytes max)")
+    return raw
+
+
+def _decode_name(raw):
+    return raw.rstrip(b'\0').decode('utf-8')
+
+
+class JournalStore(ProgressStore):
+    """Single-process journal backend; a second process opening the same journal gets StoreError"""
+
+    def __init__(self, journal_path, snapshot_path=None, compact_interval=60.0,
+                 compact_records=10000, keep_history=True, fsync=False):
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else self.journal_path.with_name(
+            self.journal_path.name + '.snapshot.json')
+        self.rolling_path = self.journal_path.with_name(self.journal_path.name + '.rolling')
+        self.compact_interval = compact_interval
+        self.compact_records = compact_records
+        self.keep_history = keep_history
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._owner = self._claim_journal()
+        self._data = self._recover()
+        self._fd = self._open_journal()
+        self._pending = 0
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._compactor = threading.Thread(target=self._compact_loop, name='journal-compactor', daemon=True)
+        self._compactor.start()
+
+    # Start-up
+
+    def _claim_journal(self):
+        """Take an exclusive lock so two processes never append to the same journal"""
+        owner = open(self.journal_path.with_name(self.journal_path.name + '.lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(owner.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                owner.close()
+                raise StoreError(f"{self.journal_path} is already in use by another process")
+        return owner
+
+    def _recover(self):
+        """Rebuild the state from the snapshot and the journal records written after it"""
+        data = {}
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for regions in data.values():
+                for activities in regions.values():
+                    for activity, cell in activities.items():
+                        if not isinstance(cell, list):
+                            activities[activity] = [cell, None]
+        # A rolling segment left by an interrupted compaction may or may not be
+        # in the snapshot; records are absolute values, so replaying it is safe
+        for path in (self.rolling_path, self.journal_path):
+            for record in self._read_records(path):
+                self._apply(data, record)
+        return data
+
+    def _open_journal(self):
+        return os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    # Records
+
+    def _read_records(self, path) -> Iterator[Dict]:
+        """Yield the records of one journal file, ignoring a torn record at the end"""
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            while True:
+                chunk = f.read(RECORD.size)
+                if len(chunk) < RECORD.size:
+                    return
+                op, ts, stars, learner, region, activity = RECORD.unpack(chunk)
+                yield {
+                    'op': OPS[op],
+                    'time': ts,
+                    'learner': _decode_name(learner),
+                    'region': _decode_name(region),
+                    'activity': _decode_name(activity),
+                    'stars': stars,
+                }
+
+    def _apply(self, data, record):
+        if record['op'] == 'set':
+            cell = [record['stars'], record['time']]
+            data.setdefault(record['learner'], {}).setdefault(record['region'], {})[record['activity']] = cell
+        elif record['op'] == 'reset':
+            data.pop(record['learner'], None)
+        else:
+            data.clear()
+
+    def _append(self, op, learner, region='', activity='', stars=0):
+        """Write one record; return its time"""
+        now = time.time()
+        record = RECORD.pack(op, now, stars,
+                             _encode_name(learner, 64, 'learner'),
+                             _encode_name(region, 24, 'region'),
+                             _encode_name(activity, 24, 'activity'))
+        os.write(self._fd, record)
+        if self.fsync:
+            os.fsync(self._fd)
+        self._pending += 1
+        if self._pending >= self.compact_records:
+            self._wake.set()
+        return now
+
+    # ProgressStore
+
+    def get_learner(self, learner: str) -> LearnerData:
+        with self._lock:
+            return {region: {activity: stars for activity, (stars, _) in activities.items()}
+                    for region, activities in self._data.get(learner, {}).items()}
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        # Only the learner ids are copied up front; each learner's cells are
+        # read under the lock when reached, so a scan does not hold the lock
+        # or duplicate the progress. Learners reset meanwhile are skipped.
+        with self._lock:
+            learners = list(self._data)
+        for learner in learners:
+            with self._lock:
+                cells = [(region, activity, stars, updated_at)
+                         for region, activities in self._data.get(learner, {}).items()
+                         for activity, (stars, updated_at) in activities.items()]
+            for region, activity, stars, updated_at in cells:
+                yield learner, region, activity, stars, updated_at
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        self.set_many([(learner, region, activity, stars)])
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        with self._lock:
+            for learner, region, activity, stars in updates:
+                now = self._append(OP_SET, learner, region, activity, stars)
+                self._data.setdefault(learner, {}).setdefault(region, {})[activity] = [stars, now]
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        with self._lock:
+            if learner is None:
+                self._append(OP_RESET_ALL, '')
+                self._data.clear()
+            else:
+                self._append(OP_RESET, learner)
+                self._data.pop(learner, None)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._compactor.join()
+        self.compact()
+        with self._lock:
+            os.close(self._fd)
+            self._fd = None
+        self._owner.close()
+
+    # Audit trail and compaction
+
+    def history(self, learner: Optional[str] = None) -> Iterator[Dict]:
+        """Yield every recorded change (oldest first), optionally for one learner only"""
+        segments = sorted(self.journal_path.parent.glob(self.journal_path.name + '.[0-9]*'))
+        for path in segments + [self.rolling_path, self.journal_path]:
+            for record in self._read_records(path):
+                if learner is None or record['learner'] == learner or record['op'] == 'reset_all':
+                    yield record
+
+    def compact(self) -> None:
+        """Roll the current journal into a new snapshot"""
+        with self._compact_lock:
+            with self._lock:
+                if self._fd is None or (self._pending == 0 and not self.rolling_path.exists()):
+                    return
+                # Swap in an empty journal; writers continue while the snapshot is written
+                os.close(self._fd)
+                try:
+                    if self.rolling_path.exists():
+                        self._merge_rolling()
+                    else:
+                        os.replace(self.journal_path, self.rolling_path)
+                finally:
+                    self._fd = self._open_journal()
+                self._pending = 0
+                data = copy.deepcopy(self._data)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_path.parent, prefix=self.snapshot_path.name, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            if self.keep_history:
+                os.replace(self.rolling_path, self.journal_path.with_name(f"{self.journal_path.name}.{time.time_ns()}"))
+            else:
+                os.unlink(self.rolling_path)
+
+    def _merge_rolling(self):
+        """Append the journal to a rolling segment left by a failed snapshot write.
+
+        That segment is in no snapshot yet, so replacing it would lose its
+        records; the next snapshot covers both.
+        """
+        with open(self.rolling_path, 'r+b') as rolling:
+            # Drop a torn record at the end so the appended ones stay aligned
+            size = os.fstat(rolling.fileno()).st_size
+            rolling.truncate(size - size % RECORD.size)
+            rolling.seek(0, os.SEEK_END)
+            try:
+                with open(self.journal_path, 'rb') as journal:
+                    shutil.copyfileobj(journal, rolling)
+            except FileNotFoundError:
+                pass
+            rolling.flush()
+            os.fsync(rolling.fileno())
+        try:
+            os.unlink(self.journal_path)
+        except FileNotFoundError:
+            pass
+
+    def _compact_loop(self):
+        """Compact every compact_interval seconds, or early once compact_records are pending"""
+        while True:
+            self._wake.wait(self.compact_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.compact()
+            except Exception as e:
+                # Keep the thread alive: the records are safe in the journal and the next round retries
+                print(f"Journal compaction failed: {e!r}")
@@ -0,0 +1,159 @@
+"""Progress storage in a single JSON document: {learner: {region: {activity: stars}}}"""
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, StoreError
+from .locks import file_lock
+
+
+class JsonStore(ProgressStore):
+    """Keeps a parsed snapshot of the JSON file and re-reads it only when the file changes.
+
+    Writers take an exclusive lock on a sidecar ``.lock`` file, write the new
+    document to a temporary file and rename it over the old one, so readers
+    (which only take a shared lock) always see either the old or the new
+    document, never a truncated one.
+
+    The file's stamp (inode, mtime, size) is the version of every learner:
+    any write, in any process, changes it.
+    """
+
+    def __init__(self, path, read_retries=3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self.read_retries = read_retries
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._cache = None
+        self._cache_stamp = None
+
+    def _file_stamp(self, stat):
+        """Identify one version of the data file"""
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _current_stamp(self):
+        """Stamp of the data file as it is now; () when it does not exist yet"""
+        try:
+            return self._file_stamp(self.path.stat())
+        except FileNotFoundError:
+            return ()
+
+    def _read_file(self):
+        """Read and parse the file, returning (data, stamp) or raising StoreError on a torn read"""
+        for attempt in range(self.read_retries):
+            try:
+                with open(self.path, 'rb') as f:
+                    stamp = self._file_stamp(os.fstat(f.fileno()))
+                    raw = f.read()
+            except FileNotFoundError:
+                return {}, None
+            # A short read or a document that does not parse means another
+            # writer (e.g. an older copy of the app) is rewriting the file in place
+            if len(raw) == stamp[2]:
+                try:
+                    return json.loads(raw.decode('utf-8') or '{}'), stamp
+                except ValueError:
+                    pass
+            time.sleep(0.01 * (attempt + 1))
+        raise StoreError(f"{self.path} is truncated or corrupt; refusing to treat it as empty")
+
+    def _load(self):
+        """Return the whole document, from the snapshot when the file is unchanged"""
+        try:
+            stamp = self._file_stamp(self.path.stat())
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if self._cache is not None and stamp == self._cache_stamp:
+                return self._cache
+        with file_lock(self.lock_path, exclusive=False):
+            data, stamp = self._read_file()
+        with self._lock:
+            self._cache = data
+            self._cache_stamp = stamp
+        return data
+
+    def _save(self, data):
+        """Atomically replace the file with data and return its stamp; the caller holds the exclusive lock"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+                stamp = self._file_stamp(os.fstat(f.fileno()))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._cache = data
+            self._cache_stamp = stamp
+        return stamp
+
+    def _update(self, change):
+        """Apply change(data) to a fresh copy of the document under the exclusive lock.
+
+        Returns the file's stamps (before, after).
+        """
+        with self._write_lock, file_lock(self.lock_path, exclusive=True):
+            # Re-check the file inside the lock so updates from other processes are not lost
+            stamp = self._current_stamp()
+            with self._lock:
+                cached = self._cache if stamp and stamp == self._cache_stamp else None
+            data = copy.deepcopy(cached) if cached is not None else self._read_file()[0]
+            change(data)
+            return stamp, self._save(data)
+
+    def get_learner(self, learner: str) -> LearnerData:
+        return copy.deepcopy(self._load().get(learner, {}))
+
+    def learner_version(self, learner: str) -> Tuple:
+        return self._current_stamp()
+
+    def changed_learners(self, since: float) -> Optional[List[str]]:
+        # The document has no per-learner times: a file written since then may have changed anybody
+        try:
+            modified = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return []
+        return None if modified >= since else []
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        for learner, regions in self._load().items():
+            for region, activities in regions.items():
+                for activity, stars in activities.items():
+                    yield learner, region, activity, stars, None
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        self.set_many_versioned([(learner, region, activity, stars)])
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        self.set_many_versioned(updates)
+
+    def set_many_versioned(self, updates: Iterable[StarUpdate]) -> Dict[str, Tuple[Any, Any]]:
+        updates = list(updates)
+
+        def change(data):
+            for learner, region, activity, stars in updates:
+                data.setdefault(learner, {}).setdefault(region, {})[activity] = stars
+        versions = self._update(change)
+        return {learner: versions for learner, _, _, _ in updates}
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        def change(data):
+            if learner is None:
+                data.clear()
+            else:
+                data.pop(learner, None)
+        self._update(change)
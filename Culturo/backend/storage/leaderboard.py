@@ -0,0 +1,227 @@
+"""Leaderboards and percentiles maintained incrementally from star writes"""
+import bisect
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..utils.config import COHORT_SEPARATOR, LEADERBOARD_REFRESH_INTERVAL
+from .base import StarRecord
+
+# Each refresh re-reads changes from this many seconds before the previous one,
+# so a write committed just after a refresh started is not skipped
+REFRESH_OVERLAP = 1.0
+
+
+def cohort_of(learner: str) -> Optional[str]:
+    """Class of a learner id like "5A:amy", or None"""
+    cohort, separator, _ = learner.partition(COHORT_SEPARATOR)
+    return cohort if separator else None
+
+
+class RankIndex:
+    """Order statistics over integer scores, bucketed by score.
+
+    Star totals only take a few dozen distinct values, so keeping one sorted
+    list of members per score (plus the sorted list of scores in use) makes
+    an update two bisects, a top-N query a walk down the best buckets that
+    stops after N members, and rank and percentile queries O(distinct scores)
+    no matter how many learners there are.
+    """
+
+    def __init__(self, scores=None):
+        """Index {member: score}; bulk-loading sorts each bucket once instead of inserting one by one"""
+        self._scores = dict(scores or {})
+        self._buckets = {}
+        for member, score in self._scores.items():
+            self._buckets.setdefault(score, []).append(member)
+        for bucket in self._buckets.values():
+            bucket.sort()
+        self._keys = sorted(self._buckets)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def update(self, member, score):
+        old = self._scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            self._discard(member, old)
+        self._scores[member] = score
+        bucket = self._buckets.get(score)
+        if bucket is None:
+            bucket = self._buckets[score] = []
+            bisect.insort(self._keys, score)
+        bisect.insort(bucket, member)
+
+    def remove(self, member):
+        old = self._scores.pop(member, None)
+        if old is not None:
+            self._discard(member, old)
+
+    def _discard(self, member, score):
+        bucket = self._buckets[score]
+        del bucket[bisect.bisect_left(bucket, member)]
+        if not bucket:
+            del self._buckets[score]
+            del self._keys[bisect.bisect_left(self._keys, score)]
+
+    def top(self, limit):
+        """[(member, score)] of the best `limit` members; ties ordered by member id"""
+        result = []
+        for score in reversed(self._keys):
+            if len(result) >= limit:
+                break
+            result.extend((member, score) for member in self._buckets[score][:limit - len(result)])
+        return result
+
+    def position(self, member):
+        """(score, members above, members level) for a ranked member, or None"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        index = bisect.bisect_right(self._keys, score)
+        above = sum(len(self._buckets[key]) for key in self._keys[index:])
+        return score, above, len(self._buckets[score])
+
+
+class Leaderboard:
+    """Materialised rankings: overall, per region and per class.
+
+    Fed by IndexedStore write notifications (see attach()), so queries never
+    scan the learners. Writes made by other processes (e.g. the Streamlit
+    pages, when this is the API server) are picked up by refresh(), which
+    queries run at most every refresh_interval seconds: it asks the store
+    which learners changed since the last refresh and re-ranks only those.
+    """
+
+    def __init__(self, refresh_interval=LEADERBOARD_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._overall = RankIndex()
+        self._regions = {}
+        self._cohorts = {}
+        self._store = None
+        self._watermark = None
+        self._refreshed = 0.0
+
+    def attach(self, store):
+        """Load the current standings from store and follow its writes from now on"""
+        self._store = store
+        self._watermark = time.time() - REFRESH_OVERLAP
+        self._refreshed = time.monotonic()
+        store.subscribe(self.on_summary, replay=self.rebuild)
+
+    def refresh(self):
+        """Re-rank the learners other processes changed since the last refresh; rate-limited"""
+        if self._store is None or time.monotonic() - self._refreshed < self.refresh_interval:
+            return
+        # One refresh at a time; queries arriving meanwhile use the current standings
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._refreshed = time.monotonic()
+            started = time.time()
+            changed = self._store.changed_learners(self._watermark)
+            if changed is None:
+                self.rebuild(self._store.iter_records())
+            else:
+                for learner in changed:
+                    data, summary = self._store.snapshot(learner)
+                    self.on_summary(learner, summary if data else None)
+            self._watermark = started - REFRESH_OVERLAP
+        finally:
+            self._refresh_lock.release()
+
+    def rebuild(self, records: Iterator[StarRecord]):
+        """Replace the standings with totals computed from all stored records"""
+        totals = {}
+        for learner, region, _, stars, _ in records:
+            regions = totals.setdefault(learner, {})
+            regions[region] = regions.get(region, 0) + stars
+        overall = {}
+        regions = {}
+        cohorts = {}
+        for learner, region_totals in totals.items():
+            total = sum(region_totals.values())
+            overall[learner] = total
+            for region, region_total in region_totals.items():
+                regions.setdefault(region, {})[learner] = region_total
+            cohort = cohort_of(learner)
+            if cohort is not None:
+                cohorts.setdefault(cohort, {})[learner] = total
+        with self._lock:
+            self._overall = RankIndex(overall)
+            self._regions = {region: RankIndex(scores) for region, scores in regions.items()}
+            self._cohorts = {cohort: RankIndex(scores) for cohort, scores in cohorts.items()}
+
+    def on_summary(self, learner: Optional[str], summary: Optional[Dict[str, Any]]):
+        """IndexedStore listener: re-rank one learner after a write, or drop them after a reset"""
+        with self._lock:
+            if summary is not None:
+                self._update(learner, summary['total'],
+                             {region: info['total'] for region, info in summary['regions'].items()})
+            elif learner is None:
+                self._overall = RankIndex()
+                self._regions = {}
+                self._cohorts = {}
+            else:
+                self._overall.remove(learner)
+                for index in self._regions.values():
+                    index.remove(learner)
+                cohort = cohort_of(learner)
+                if cohort in self._cohorts:
+                    self._cohorts[cohort].remove(learner)
+
+    def _update(self, learner, total, region_totals):
+        self._overall.update(learner, total)
+        for region, region_total in region_totals.items():
+            self._regions.setdefault(region, RankIndex()).update(learner, region_total)
+        cohort = cohort_of(learner)
+        if cohort is not None:
+            self._cohorts.setdefault(cohort, RankIndex()).update(learner, total)
+
+    def _index(self, region, cohort):
+        if region is not None and cohort is not None:
+            raise ValueError("Rank by region or by class, not both")
+        if region is not None:
+            return self._regions.get(region, RankIndex())
+        if cohort is not None:
+            return self._cohorts.get(cohort, RankIndex())
+        return self._overall
+
+    def top(self, limit=10, region=None, cohort=None) -> List[Dict[str, Any]]:
+        """Best learners overall, in one region, or in one class"""
+        self.refresh()
+        with self._lock:
+            entries = self._index(region, cohort).top(limit)
+        ranked = []
+        for position, (learner, stars) in enumerate(entries):
+            # Learners with the same stars share a rank
+            rank = ranked[-1]['rank'] if ranked and ranked[-1]['stars'] == stars else position + 1
+            ranked.append({'rank': rank, 'learner': learner, 'stars': stars})
+        return ranked
+
+    def standing(self, learner, region=None, cohort=None) -> Optional[Dict[str, Any]]:
+        """Rank and percentile of one learner, or None if they have no stars recorded.
+
+        The percentile is the share of ranked learners scoring below, counting
+        ties as half: 100 for a clear leader, 50 when everybody is level.
+        """
+        self.refresh()
+        with self._lock:
+            index = self._index(region, cohort)
+            position = index.position(learner)
+            count = len(index)
+        if position is None:
+            return None
+        stars, above, level = position
+        below = count - above - level
+        return {
+            'learner': learner,
+            'stars': stars,
+            'rank': above + 1,
+            'learners': count,
+            'percentile': 100.0 * (below + 0.5 * level) / count,
+        }
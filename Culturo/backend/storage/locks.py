@@ -0,0 +1,68 @@
+"""Locking helpers for the progress storage backends"""
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, os.replace still keeps writes atomic
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path, exclusive):
+    """Hold an fcntl advisory lock on lock_path: shared for readers, exclusive for writers.
+
+    The lock lives on a separate file because the data file itself is
+    replaced (renamed over) on every write.
+    """
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class RWLock:
+    """Reader-writer lock for threads: many readers at once, or one writer.
+
+    Waiting writers block new readers, so a steady stream of reads cannot
+    starve a write.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
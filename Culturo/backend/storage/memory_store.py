@@ -0,0 +1,48 @@
+"""Progress kept in process memory only (tests, demos, benchmarks)"""
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate
+
+
+class MemoryStore(ProgressStore):
+    """Holds {learner: {(region, activity): (stars, updated_at)}} in a dict; nothing survives a restart"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_learner(self, learner: str) -> LearnerData:
+        with self._lock:
+            cells = list(self._data.get(learner, {}).items())
+        data = {}
+        for (region, activity), (stars, _) in cells:
+            data.setdefault(region, {})[activity] = stars
+        return data
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        with self._lock:
+            learners = list(self._data)
+        for learner in learners:
+            with self._lock:
+                cells = list(self._data.get(learner, {}).items())
+            for (region, activity), (stars, updated_at) in cells:
+                yield learner, region, activity, stars, updated_at
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        with self._lock:
+            self._data.setdefault(learner, {})[(region, activity)] = (stars, time.time())
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        now = time.time()
+        with self._lock:
+            for learner, region, activity, stars in updates:
+                self._data.setdefault(learner, {})[(region, activity)] = (stars, now)
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        with self._lock:
+            if learner is None:
+                self._data.clear()
+            else:
+                self._data.pop(learner, None)
@@ -0,0 +1,285 @@
+"""Compact columnar progress storage: 2 bits per (region, activity) cell, one byte row per learner.
+
+Region/activity pairs are interned to cell indexes, and each learner's stars
+(0-3) are packed four cells to a byte in a NumPy uint8 matrix, so the three
+regions x four activities of a learner take 3 bytes. Cohort-wide figures are
+computed with vectorised reductions over that matrix. Requires NumPy (it is
+installed together with Streamlit).
+
+On disk the matrix is a memory-mapped file, so a write only dirties the
+pages of the rows it changes, and learner ids go to an append-only file;
+the cost of a write does not depend on how many learners are stored:
+
+    progress.packed            16-byte header (magic, row width) + packed rows
+    progress.packed.ids        learner ids in row order: 2-byte length + UTF-8
+    progress.packed.cells.json the (region, activity) of each cell index
+"""
+import json
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, StoreError
+from .locks import fcntl
+
+CELLS_PER_BYTE = 4
+MAX_STARS = 3
+MAGIC = b'CULTPK1\0'
+HEADER = struct.Struct('<8sII')
+ID_LENGTH = struct.Struct('<H')
+
+
+class PackedStore(ProgressStore):
+    """Packed matrix mapped from disk; single-process, a second process opening the same files gets StoreError"""
+
+    def __init__(self, path, cells=(), capacity=1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ids_path = self.path.with_name(self.path.name + '.ids')
+        self.cells_path = self.path.with_name(self.path.name + '.cells.json')
+        self._lock = threading.Lock()
+        self._owner = self._claim()
+        self._cells = {}
+        self._learners = {}
+        self._learner_ids = []
+        self._packed = None
+        self._ids_fd = None
+
+        if self.path.exists():
+            self._load()
+        else:
+            self._create(capacity, 1)
+        self._ids_fd = os.open(self.ids_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # Pre-intern the known catalogue so its cell order is stable
+        for region, activity in cells:
+            self._cell(region, activity)
+
+    def _claim(self):
+        """Take an exclusive lock so two processes never write the same files"""
+        owner = open(self.path.with_name(self.path.name + '.lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(owner.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                owner.close()
+                raise StoreError(f"{self.path} is already in use by another process")
+        return owner
+
+    # Interning and layout
+
+    def _cell(self, region, activity):
+        """Return the cell index of (region, activity), interning it and widening rows if needed"""
+        index = self._cells.get((region, activity))
+        if index is None:
+            index = len(self._cells)
+            width = index // CELLS_PER_BYTE + 1
+            if width > self._packed.shape[1]:
+                self._resize(self._packed.shape[0], width)
+            self._cells[(region, activity)] = index
+            self._save_cells()
+        return index
+
+    def _row(self, learner, create):
+        """Return the row of learner, appending (and growing the matrix) if create is set"""
+        row = self._learners.get(learner)
+        if row is None and create:
+            row = len(self._learner_ids)
+            if row >= self._packed.shape[0]:
+                self._resize(self._packed.shape[0] * 2, self._packed.shape[1])
+            raw = learner.encode('utf-8')
+            if len(raw) > 0xFFFF:
+                raise ValueError(f"learner id is too long for packed storage: {learner[:40]}...")
+            # The id is appended before its row is written: after a crash a
+            # row is at worst an id with no stars, never stars with no id
+            os.write(self._ids_fd, ID_LENGTH.pack(len(raw)) + raw)
+            self._learners[learner] = row
+            self._learner_ids.append(learner)
+        return row
+
+    def _set_cell(self, row, index, stars):
+        if not 0 <= stars <= MAX_STARS:
+            raise ValueError(f"Packed storage holds 0-{MAX_STARS} stars, got {stars}")
+        byte, shift = divmod(index, CELLS_PER_BYTE)
+        shift *= 2
+        current = int(self._packed[row, byte])
+        self._packed[row, byte] = (current & ~(MAX_STARS << shift)) | (stars << shift)
+
+    def _unpack(self, rows):
+        """Expand packed rows to a (len(rows), n_cells) matrix of star counts"""
+        shifts = np.arange(CELLS_PER_BYTE, dtype=np.uint8) * 2
+        cells = (rows[:, :, None] >> shifts) & MAX_STARS
+        return cells.reshape(rows.shape[0], rows.shape[1] * CELLS_PER_BYTE)[:, :len(self._cells)]
+
+    # Persistence
+
+    def _map(self):
+        """Map the matrix file, sized by its header and length"""
+        with open(self.path, 'rb') as f:
+            magic, width, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise StoreError(f"{self.path} is not a packed progress file")
+        capacity = (self.path.stat().st_size - HEADER.size) // width
+        self._packed = np.memmap(self.path, dtype=np.uint8, mode='r+', offset=HEADER.size, shape=(capacity, width))
+
+    def _create(self, capacity, width, rows=None):
+        """Write a new matrix file (copying rows into it) and map it; replaces the old file atomically"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w+b') as f:
+                f.write(HEADER.pack(MAGIC, width, 0))
+                f.truncate(HEADER.size + capacity * width)
+                if rows is not None and len(rows):
+                    matrix = np.memmap(f, dtype=np.uint8, mode='r+', offset=HEADER.size, shape=(capacity, width))
+                    matrix[:rows.shape[0], :rows.shape[1]] = rows
+                    matrix.flush()
+                    del matrix
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._map()
+
+    def _resize(self, capacity, width):
+        """Grow the matrix to capacity rows of width bytes"""
+        if width == self._packed.shape[1]:
+            # More rows only: extend the file in place, existing pages stay as they are
+            self._packed.flush()
+            with open(self.path, 'r+b') as f:
+                f.truncate(HEADER.size + capacity * width)
+            self._map()
+        else:
+            # Wider rows change every row's offset: rare (a new activity), so rewrite
+            self._create(capacity, width, np.asarray(self._packed[:len(self._learner_ids)]))
+
+    def _save_cells(self):
+        cells = sorted(self._cells, key=self._cells.get)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.cells_path.name, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump([list(cell) for cell in cells], f, ensure_ascii=False)
+        os.replace(tmp_path, self.cells_path)
+
+    def _load(self):
+        self._map()
+        try:
+            cells = json.loads(self.cells_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            cells = []
+        self._cells = {(region, activity): index for index, (region, activity) in enumerate(cells)}
+        self._learner_ids = self._read_ids()
+        self._learners = {learner: row for row, learner in enumerate(self._learner_ids)}
+        if len(self._learner_ids) > self._packed.shape[0]:
+            self._resize(len(self._learner_ids), self._packed.shape[1])
+
+    def _read_ids(self):
+        """Learner ids in row order, dropping a record torn by a crash"""
+        try:
+            raw = self.ids_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        ids = []
+        offset = 0
+        while offset + ID_LENGTH.size <= len(raw):
+            length, = ID_LENGTH.unpack_from(raw, offset)
+            end = offset + ID_LENGTH.size + length
+            if end > len(raw):
+                break
+            ids.append(raw[offset + ID_LENGTH.size:end].decode('utf-8'))
+            offset = end
+        if offset != len(raw):
+            with open(self.ids_path, 'r+b') as f:
+                f.truncate(offset)
+        return ids
+
+    # ProgressStore
+
+    def get_learner(self, learner: str) -> LearnerData:
+        with self._lock:
+            row = self._row(learner, create=False)
+            if row is None:
+                return {}
+            values = self._unpack(self._packed[row:row + 1])[0]
+            data = {}
+            for (region, activity), index in self._cells.items():
+                if values[index]:
+                    data.setdefault(region, {})[activity] = int(values[index])
+            return data
+
+    def iter_records(self, chunk_rows=65536) -> Iterator[StarRecord]:
+        start = 0
+        while True:
+            with self._lock:
+                learners = self._learner_ids[start:start + chunk_rows]
+                if not learners:
+                    return
+                values = self._unpack(self._packed[start:start + len(learners)])
+                cells = sorted(self._cells.items(), key=lambda item: item[1])
+            for learner, row in zip(learners, values):
+                for (region, activity), index in cells:
+                    if row[index]:
+                        yield learner, region, activity, int(row[index]), None
+            start += chunk_rows
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        self.set_many([(learner, region, activity, stars)])
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        with self._lock:
+            for learner, region, activity, stars in updates:
+                index = self._cell(region, activity)
+                self._set_cell(self._row(learner, create=True), index, stars)
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        with self._lock:
+            if learner is None:
+                self._packed[:] = 0
+            else:
+                row = self._row(learner, create=False)
+                if row is None:
+                    return
+                self._packed[row] = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._packed is not None:
+                self._packed.flush()
+            if self._ids_fd is not None:
+                os.close(self._ids_fd)
+                self._ids_fd = None
+        self._owner.close()
+
+    # Bulk operations
+
+    def learner_totals(self) -> Dict[str, int]:
+        """Total stars of every learner, computed in one vectorised pass"""
+        with self._lock:
+            count = len(self._learner_ids)
+            totals = self._unpack(self._packed[:count]).sum(axis=1, dtype=np.int64)
+            return dict(zip(self._learner_ids, totals.tolist()))
+
+    def cohort_totals(self) -> Dict:
+        """Stars summed over all learners: overall, per region and per (region, activity)"""
+        with self._lock:
+            rows = self._packed[:len(self._learner_ids)]
+            per_cell = self._unpack(rows).sum(axis=0, dtype=np.int64)
+            # A reset zeroes a learner's row but keeps it; like the other backends, only count learners with stars
+            count = int(np.count_nonzero(rows.any(axis=1)))
+            activities = {}
+            regions = {}
+            for (region, activity), index in self._cells.items():
+                value = int(per_cell[index])
+                activities.setdefault(region, {})[activity] = value
+                regions[region] = regions.get(region, 0) + value
+            return {
+                'learners': count,
+                'total': int(per_cell.sum()),
+                'regions': regions,
+                'activities': activities,
+            }
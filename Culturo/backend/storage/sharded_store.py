@@ -0,0 +1,106 @@
+"""Progress storage split over N independent shards routed by learner hash"""
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, merge_cohort_totals
+
+
+def shard_index(learner: str, shard_count: int) -> int:
+    """Stable shard of a learner (CRC32 is the same in every process, unlike hash())"""
+    return zlib.crc32(learner.encode('utf-8')) % shard_count
+
+
+class ShardedStore(ProgressStore):
+    """Routes every learner to one of several stores (e.g. one SQLite file per shard).
+
+    Writes to different shards proceed in parallel; writes to the same shard
+    are serialised by that shard's lock. Cohort-wide reports run one task per
+    shard through scan().
+    """
+
+    def __init__(self, shards: Sequence[ProgressStore]):
+        if not shards:
+            raise ValueError("ShardedStore needs at least one shard")
+        self.shards = list(shards)
+        self._locks = [threading.Lock() for _ in self.shards]
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix='star-shard')
+
+    def _route(self, learner):
+        index = shard_index(learner, len(self.shards))
+        return self.shards[index], self._locks[index]
+
+    def get_learner(self, learner: str) -> LearnerData:
+        shard, _ = self._route(learner)
+        return shard.get_learner(learner)
+
+    def summary(self, learner: str) -> Dict[str, Any]:
+        shard, _ = self._route(learner)
+        return shard.summary(learner)
+
+    def learner_version(self, learner: str) -> Optional[Hashable]:
+        shard, _ = self._route(learner)
+        return shard.learner_version(learner)
+
+    def changed_learners(self, since: float) -> Optional[List[str]]:
+        changed = []
+        for learners in self.scan(lambda shard: shard.changed_learners(since)):
+            if learners is None:
+                return None
+            changed.extend(learners)
+        return changed
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        shard, lock = self._route(learner)
+        with lock:
+            shard.set_stars(learner, region, activity, stars)
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        self.set_many_versioned(updates)
+
+    def set_many_versioned(self, updates: Iterable[StarUpdate]) -> Dict[str, Tuple[Any, Any]]:
+        batches = {}
+        for update in updates:
+            batches.setdefault(shard_index(update[0], len(self.shards)), []).append(update)
+
+        def write(index):
+            with self._locks[index]:
+                return self.shards[index].set_many_versioned(batches[index])
+
+        if len(batches) == 1:
+            # One shard (e.g. one learner's update): no need for a pool thread
+            return write(next(iter(batches)))
+        versions = {}
+        # Waits for every shard and re-raises the first failure
+        for shard_versions in self._executor.map(write, batches):
+            versions.update(shard_versions)
+        return versions
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        if learner is not None:
+            shard, lock = self._route(learner)
+            with lock:
+                shard.reset(learner)
+            return
+
+        def reset_shard(index):
+            with self._locks[index]:
+                self.shards[index].reset()
+        list(self._executor.map(reset_shard, range(len(self.shards))))
+
+    def scan(self, fn: Callable[[ProgressStore], Any]) -> List[Any]:
+        """Run fn(shard) on every shard in parallel and return the results in shard order"""
+        return list(self._executor.map(fn, self.shards))
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        for shard in self.shards:
+            yield from shard.iter_records()
+
+    def cohort_totals(self) -> Dict[str, Any]:
+        return merge_cohort_totals(self.scan(lambda shard: shard.cohort_totals()))
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for shard in self.shards:
+            shard.close()
@@ -0,0 +1,214 @@
+"""Progress storage in SQLite (WAL mode) with one row per (learner, region, activity)"""
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.config import SQLITE_POOL_SIZE
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, StoreError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stars (
+    learner    TEXT    NOT NULL,
+    region     TEXT    NOT NULL,
+    activity   TEXT    NOT NULL,
+    stars      INTEGER NOT NULL,
+    updated_at REAL    NOT NULL,
+    PRIMARY KEY (learner, region, activity)
+) WITHOUT ROWID
+"""
+
+# One row per learner whose version goes up in the same transaction as every
+# write or reset of that learner, so other processes can tell their cached
+# copy is stale with one primary-key lookup
+VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS learner_versions (
+    learner    TEXT    PRIMARY KEY,
+    version    INTEGER NOT NULL,
+    updated_at REAL    NOT NULL
+) WITHOUT ROWID
+"""
+# Databases created before learner_versions existed: start every learner at version 0
+VERSIONS_INDEX = "CREATE INDEX IF NOT EXISTS learner_versions_updated_at ON learner_versions (updated_at)"
+SEED_VERSIONS = """
+INSERT OR IGNORE INTO learner_versions (learner, version, updated_at)
+SELECT learner, 0, MAX(updated_at) FROM stars GROUP BY learner
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache always gets a hit and reuses the prepared statement
+SELECT_LEARNER = "SELECT region, activity, stars FROM stars WHERE learner = ?"
+SELECT_ALL = "SELECT learner, region, activity, stars, updated_at FROM stars ORDER BY learner"
+UPSERT_STARS = """
+INSERT INTO stars (learner, region, activity, stars, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (learner, region, activity)
+DO UPDATE SET stars = excluded.stars, updated_at = excluded.updated_at
+"""
+DELETE_LEARNER = "DELETE FROM stars WHERE learner = ?"
+DELETE_ALL = "DELETE FROM stars"
+SELECT_VERSION = "SELECT version FROM learner_versions WHERE learner = ?"
+SELECT_CHANGED = "SELECT learner FROM learner_versions WHERE updated_at >= ?"
+BUMP_VERSION = """
+INSERT INTO learner_versions (learner, version, updated_at)
+VALUES (?, 1, ?)
+ON CONFLICT (learner)
+DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+"""
+BUMP_ALL_VERSIONS = "UPDATE learner_versions SET version = version + 1, updated_at = ?"
+
+
+class SQLiteStore(ProgressStore):
+    """SQLite backend over a bounded pool of connections.
+
+    WAL mode lets readers run alongside the single writer, so concurrent
+    learners only serialise on the short upsert transactions. Each operation
+    checks a connection out of the pool and returns it when done, so however
+    many threads call in (Streamlit runs every rerun on a new thread), at
+    most pool_size connections are ever open.
+    """
+
+    def __init__(self, path, busy_timeout=5.0, pool_size=SQLITE_POOL_SIZE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self.pool_size = pool_size
+        # Idle connections; LIFO so a warm one (statement cache filled) is reused first
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._closed = False
+        self._pool_lock = threading.Lock()
+
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(SCHEMA)
+                seed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'learner_versions'").fetchone() is None
+                conn.execute(VERSIONS_SCHEMA)
+                conn.execute(VERSIONS_INDEX)
+                if seed:
+                    conn.execute(SEED_VERSIONS)
+
+    def _open(self):
+        # Used by one thread at a time, but not always the thread that opened it
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Check a connection out of the pool, opening one if fewer than pool_size exist"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._pool_lock:
+                if self._closed:
+                    raise StoreError(f"{self.path} is closed")
+                if self._opened < self.pool_size:
+                    self._opened += 1
+                    opening = True
+                else:
+                    opening = False
+            if opening:
+                try:
+                    conn = self._open()
+                except sqlite3.Error:
+                    with self._pool_lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.busy_timeout)
+                except queue.Empty:
+                    raise StoreError(f"No free connection to {self.path} within {self.busy_timeout}s")
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                closed = self._closed
+                if closed:
+                    self._opened -= 1
+            if closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def open_connections(self) -> int:
+        """Connections currently open (idle or checked out)"""
+        with self._pool_lock:
+            return self._opened
+
+    def get_learner(self, learner: str) -> LearnerData:
+        data = {}
+        with self._connection() as conn:
+            for region, activity, stars in conn.execute(SELECT_LEARNER, (learner,)):
+                data.setdefault(region, {})[activity] = stars
+        return data
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        # The cursor streams rows, so scans use constant memory; the
+        # connection stays checked out until the scan ends or is abandoned
+        with self._connection() as conn:
+            cursor = conn.execute(SELECT_ALL)
+            try:
+                yield from cursor
+            finally:
+                cursor.close()
+
+    def learner_version(self, learner: str) -> int:
+        with self._connection() as conn:
+            row = conn.execute(SELECT_VERSION, (learner,)).fetchone()
+        return row[0] if row else 0
+
+    def changed_learners(self, since: float) -> List[str]:
+        with self._connection() as conn:
+            return [learner for learner, in conn.execute(SELECT_CHANGED, (since,))]
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        self.set_many_versioned([(learner, region, activity, stars)])
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        self.set_many_versioned(updates)
+
+    def set_many_versioned(self, updates: Iterable[StarUpdate]) -> Dict[str, Tuple[Any, Any]]:
+        updates = list(updates)
+        learners = list(dict.fromkeys(learner for learner, _, _, _ in updates))
+        with self._connection() as conn, conn:
+            # Take the write lock first: the versions read below are exactly
+            # the ones this transaction produced, and updated_at is stamped
+            # just before the commit, not before a wait for the lock
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            rows = [(learner, region, activity, stars, now) for learner, region, activity, stars in updates]
+            conn.executemany(UPSERT_STARS, rows)
+            conn.executemany(BUMP_VERSION, [(learner, now) for learner in learners])
+            versions = {learner: conn.execute(SELECT_VERSION, (learner,)).fetchone()[0] for learner in learners}
+        return {learner: (version - 1, version) for learner, version in versions.items()}
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        with self._connection() as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            if learner is None:
+                conn.execute(DELETE_ALL)
+                conn.execute(BUMP_ALL_VERSIONS, (now,))
+            else:
+                conn.execute(DELETE_LEARNER, (learner,))
+                conn.execute(BUMP_VERSION, (learner, now))
+
+    def close(self) -> None:
+        # Idle connections close now, checked-out ones when they are returned
+        with self._pool_lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._pool_lock:
+                self._opened -= 1
@@ -0,0 +1,134 @@
+"""Write-behind wrapper that batches star updates on a background thread"""
+import atexit
+import copy
+import threading
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .base import LearnerData, ProgressStore, StarRecord, StarUpdate, StoreError
+
+
+class WriteBehindStore(ProgressStore):
+    """Queues writes in memory and lets one flusher thread persist them in batches.
+
+    Updates to the same (learner, region, activity) are coalesced, last write
+    wins. Reads overlay the queued values, so a learner always sees their own
+    writes even before they reach the wrapped store. Pending writes are flushed
+    every `interval` seconds, on close() and at interpreter exit. Writes after
+    close() raise StoreError, since nothing would flush them.
+
+    Versions are the wrapped store's: a queued write leaves them unchanged
+    until it is flushed.
+    """
+
+    def __init__(self, inner: ProgressStore, interval=1.0):
+        self.inner = inner
+        self.interval = interval
+        self._pending = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='star-write-behind', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _overlay(self, learner, data):
+        """Apply queued values for learner on top of data read from the wrapped store"""
+        with self._lock:
+            for queue in (self._inflight, self._pending):
+                for (owner, region, activity), stars in queue.items():
+                    if owner == learner:
+                        data.setdefault(region, {})[activity] = stars
+        return data
+
+    def get_learner(self, learner: str) -> LearnerData:
+        return self._overlay(learner, copy.deepcopy(self.inner.get_learner(learner)))
+
+    def iter_records(self) -> Iterator[StarRecord]:
+        # Scans see everything written so far
+        self.flush()
+        return self.inner.iter_records()
+
+    def cohort_totals(self) -> Dict[str, Any]:
+        self.flush()
+        return self.inner.cohort_totals()
+
+    def learner_version(self, learner: str) -> Optional[Hashable]:
+        return self.inner.learner_version(learner)
+
+    def changed_learners(self, since: float) -> Optional[List[str]]:
+        return self.inner.changed_learners(since)
+
+    def set_many_versioned(self, updates: Iterable[StarUpdate]) -> Dict[str, Tuple[Any, Any]]:
+        updates = list(updates)
+        versions = {learner: self.inner.learner_version(learner) for learner, _, _, _ in updates}
+        self.set_many(updates)
+        return {learner: (version, version) for learner, version in versions.items()}
+
+    def _check_open(self):
+        """Called with _lock held; close() flushes last after setting _closed under it"""
+        if self._closed:
+            raise StoreError("write-behind store is closed")
+
+    def set_stars(self, learner: str, region: str, activity: str, stars: int) -> None:
+        with self._lock:
+            self._check_open()
+            self._pending[(learner, region, activity)] = stars
+
+    def set_many(self, updates: Iterable[StarUpdate]) -> None:
+        with self._lock:
+            self._check_open()
+            for learner, region, activity, stars in updates:
+                self._pending[(learner, region, activity)] = stars
+
+    def reset(self, learner: Optional[str] = None) -> None:
+        # Holding the flush lock means no batch for this learner is half-written
+        with self._flush_lock:
+            with self._lock:
+                self._check_open()
+                if learner is None:
+                    self._pending.clear()
+                else:
+                    self._pending = {key: stars for key, stars in self._pending.items() if key[0] != learner}
+            self.inner.reset(learner)
+
+    def flush(self) -> None:
+        """Persist everything queued so far"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            try:
+                self.inner.set_many((learner, region, activity, stars)
+                                    for (learner, region, activity), stars in batch.items())
+            except Exception:
+                # Requeue the batch unless newer values arrived meanwhile
+                with self._lock:
+                    for key, stars in batch.items():
+                        self._pending.setdefault(key, stars)
+                raise
+            finally:
+                with self._lock:
+                    self._inflight = {}
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush star updates: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._stop.set()
+        self._flusher.join()
+        try:
+            self.flush()
+        finally:
+            self.inner.close()
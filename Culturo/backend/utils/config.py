@@ -0,0 +1,89 @@
+"""Shared backend settings; every value can be overridden through an environment variable"""
+import os
+from pathlib import Path
+
+# Project layout
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Progress storage: "sqlite" (default), "json", "journal", "packed" (needs NumPy)
+# or "memory" (nothing persisted; for tests and demos). "daemon" forwards every
+# call to the local progress daemon (backend/progress_daemon.py)
+STORAGE_BACKEND = os.environ.get("CULTURO_STORAGE", "sqlite")
+SQLITE_PATH = Path(os.environ.get("CULTURO_SQLITE_PATH", DATA_DIR / "progress.db"))
+JSON_PATH = Path(os.environ.get("CULTURO_JSON_PATH", DATA_DIR / "stars.json"))
+JOURNAL_PATH = Path(os.environ.get("CULTURO_JOURNAL_PATH", DATA_DIR / "progress.journal"))
+PACKED_PATH = Path(os.environ.get("CULTURO_PACKED_PATH", DATA_DIR / "progress.packed"))
+
+# Progress daemon: the Unix socket it listens on, and the backend it stores progress in
+DAEMON_SOCKET = Path(os.environ.get("CULTURO_DAEMON_SOCKET", DATA_DIR / "progress.sock"))
+DAEMON_STORAGE = os.environ.get("CULTURO_DAEMON_STORAGE", "journal")
+
+# Regions and activities known up front (the packed backend lays its cells out in this order)
+REGIONS = ('Hong Kong', 'China', 'Vietnam')
+ACTIVITIES = ('Language', 'Draw Animals', 'Food', 'Performance')
+
+# Old activity names still accepted from clients and found in saved data
+ACTIVITY_ALIASES = {'Language Imitation': 'Language'}
+
+# Journal backend: how often (seconds) and after how many records the
+# journal is rolled into a snapshot, and whether rolled segments are kept
+JOURNAL_COMPACT_INTERVAL = float(os.environ.get("CULTURO_JOURNAL_COMPACT_INTERVAL", "60"))
+JOURNAL_COMPACT_RECORDS = int(os.environ.get("CULTURO_JOURNAL_COMPACT_RECORDS", "10000"))
+JOURNAL_KEEP_HISTORY = os.environ.get("CULTURO_JOURNAL_KEEP_HISTORY", "1") == "1"
+
+# Number of shards; above 1 each shard gets its own file (progress-0.db, progress-1.db, ...)
+# and learners are spread over them by a stable hash of their id
+SHARDS = int(os.environ.get("CULTURO_SHARDS", "1"))
+
+# Write-behind: when > 0, star updates are queued and flushed to the backend
+# in batches every this many seconds instead of being written synchronously
+WRITE_BEHIND_INTERVAL = float(os.environ.get("CULTURO_WRITE_BEHIND_INTERVAL", "0"))
+
+# Seconds a SQLite connection waits on a locked database before giving up
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("CULTURO_SQLITE_BUSY_TIMEOUT", "5"))
+# Connections each SQLite store keeps open at most, shared by all threads
+SQLITE_POOL_SIZE = int(os.environ.get("CULTURO_SQLITE_POOL_SIZE", "8"))
+
+# Leaderboards pick up stars written by other processes at most this often (seconds)
+LEADERBOARD_REFRESH_INTERVAL = float(os.environ.get("CULTURO_LEADERBOARD_REFRESH_INTERVAL", "1"))
+
+# Learners whose data and running totals each process keeps cached (least recently used are dropped)
+INDEX_CACHE_LEARNERS = int(os.environ.get("CULTURO_INDEX_CACHE_LEARNERS", "10000"))
+
+# A region counts as fully explored once this many activities have stars
+ACTIVITIES_PER_REGION = 4
+
+# Progress API server (backend/api_server.py)
+API_HOST = os.environ.get("CULTURO_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("CULTURO_API_PORT", "5000"))
+API_THREADS = int(os.environ.get("CULTURO_API_THREADS", "16"))
+
+# Async progress server (backend/async_server.py): storage calls run on a
+# bounded pool of this many threads (SQLite connections come from the store's pool)
+ASYNC_PORT = int(os.environ.get("CULTURO_ASYNC_PORT", "5001"))
+ASYNC_IO_THREADS = int(os.environ.get("CULTURO_ASYNC_IO_THREADS", "8"))
+ASYNC_IDLE_TIMEOUT = float(os.environ.get("CULTURO_ASYNC_IDLE_TIMEOUT", "75"))
+ASYNC_MAX_PIPELINE = int(os.environ.get("CULTURO_ASYNC_MAX_PIPELINE", "16"))
+
+# Static assets: when CULTURO_ASSET_BASE_URL is set (e.g. http://127.0.0.1:5000/assets),
+# pages link images there under content-hashed names instead of inlining them;
+# api_server.py serves them with this Cache-Control max-age (seconds)
+ASSET_BASE_URL = os.environ.get("CULTURO_ASSET_BASE_URL", "").rstrip("/")
+ASSET_MAX_AGE = int(os.environ.get("CULTURO_ASSET_MAX_AGE", str(365 * 24 * 3600)))
+# Served files are kept in memory once per process (larger ones memory-mapped)
+# and sent in chunks of this size, so Range requests never copy the whole file
+MEDIA_MMAP_BYTES = int(os.environ.get("CULTURO_MEDIA_MMAP_MB", "1")) * 1024 * 1024
+MEDIA_CHUNK_BYTES = int(os.environ.get("CULTURO_MEDIA_CHUNK_KB", "64")) * 1024
+# Files this large (videos) are read through a chunk cache of this total size
+# shared by every request, or handed to the WSGI server's file_wrapper
+# (sendfile under gunicorn) when a Range runs to the end of the file
+MEDIA_STREAM_BYTES = int(os.environ.get("CULTURO_MEDIA_STREAM_MB", "32")) * 1024 * 1024
+MEDIA_CHUNK_CACHE_BYTES = int(os.environ.get("CULTURO_MEDIA_CHUNK_CACHE_MB", "64")) * 1024 * 1024
+
+# Learner ids of the form "<class>:<name>" (e.g. "5A:amy") are ranked within
+# their class as well; learners without the separator belong to no class
+COHORT_SEPARATOR = os.environ.get("CULTURO_COHORT_SEPARATOR", ":")
+
+# Learner used when a caller does not identify one (e.g. scripts, single-user runs)
+DEFAULT_LEARNER = os.environ.get("CULTURO_DEFAULT_LEARNER", "default")
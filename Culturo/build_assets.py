@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Culturo Asset Builder
+
+Writes display-sized 1x/2x variants of the map and page images (palette
+PNG and WebP) to frontend/static/, with a manifest the pages read that
+also holds a tiny placeholder of each image.
+Only images whose source changed are rebuilt.
+
+Usage: python build_assets.py [--force]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "frontend"))
+from utils.asset_pipeline import STATIC_DIR, build_assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build optimised image variants for the Culturo pages")
+    parser.add_argument('--force', action='store_true', help="rebuild every asset, even if unchanged")
+    parser.add_argument('--output', default=str(STATIC_DIR), help="output directory (default: frontend/static)")
+    args = parser.parse_args()
+
+    print("🖼️  Building image variants...")
+    manifest = build_assets(args.output, force=args.force)
+    print(f"   📄 {len(manifest['assets'])} assets in {Path(args.output) / 'manifest.json'}")
+
+
+if __name__ == "__main__":
+    main()
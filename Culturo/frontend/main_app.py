@@ -1,12 +1,12 @@
 import streamlit as st
-import base64
-import os
 from pathlib import Path
 import sys
 
 # Add utils to path
 sys.path.append(str(Path(__file__).parent))
 from utils.star_manager import star_manager
+from utils.asset_urls import lazy_image_html, vendor_stylesheets_html, vendor_url
+from utils.asset_manifest import asset_path
 
 # Build absolute path to logo
 logo_path = Path(__file__).parent.parent / "assets" / "images" / "logo.png"
@@ -20,10 +20,8 @@ st.set_page_config(
 )
 
 # CSS styles with simple sidebar
-st.markdown("""
-    <link rel='stylesheet' href='https://cdn-uicons.flaticon.com/2.6.0/uicons-regular-straight/css/uicons-regular-straight.css'>
-    <link rel='stylesheet' href='https://cdn-uicons.flaticon.com/2.6.0/uicons-regular-rounded/css/uicons-regular-rounded.css'>
-    <link rel='stylesheet' href='https://cdn.jsdelivr.net/gh/lipis/flag-icons@7.0.0/css/flag-icons.min.css'>
+# Icon font and flag styles, vendored and trimmed to the icons used (see utils/vendor_assets.py)
+st.markdown(vendor_stylesheets_html() + """
     <style>
         /* Hide page navigation */
         [data-testid="stSidebarNav"] {
@@ -191,16 +189,6 @@ st.markdown("""
 
 # Star data is now managed by star_manager utility - no initialization needed
 
-def get_image_base64(image_path):
-    """Convert image to base64 encoding"""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        st.error(f"Failed to load image {image_path}: {e}")
-        return None
-
-
 # Main page
 def main():
     # Initialize navigation counter to force fresh renders
@@ -225,8 +213,8 @@ def main():
     # Sidebar content matching the design
     with st.sidebar:
         # Culturo logo image
-        logo_img_path = Path(__file__).parent.parent / "assets" / "images" / "Cultoro.jpg"
-        if os.path.exists(logo_img_path):
+        logo_img_path = asset_path("images/Cultoro.jpg")
+        if logo_img_path:
             st.image(str(logo_img_path), width=200)
         else:
             st.markdown("""
@@ -257,25 +245,8 @@ def main():
     stats = star_manager.get_overall_stats()
     total_stars = stats['total_stars']
     
-    # Calculate explored countries based on 4/4 activities completed
-    china_stars = star_manager.get_stars('China')
-    vietnam_stars_dict = star_manager.get_stars('Vietnam')
-    hongkong_stars = star_manager.get_stars('Hong Kong')
-    
-    china_completed_activities = sum(1 for activity in ['Draw Animals', 'Language', 'Performance', 'Food'] 
-                                      if china_stars.get(activity, 0) > 0)
-    vietnam_completed_activities = sum(1 for activity in ['Draw Animals', 'Language', 'Performance', 'Food'] 
-                                        if vietnam_stars_dict.get(activity, 0) > 0)
-    hongkong_completed_activities = sum(1 for activity in ['Draw Animals', 'Language', 'Performance', 'Food'] 
-                                         if hongkong_stars.get(activity, 0) > 0)
-    
-    explored_countries = 0
-    if china_completed_activities == 4:
-        explored_countries += 1
-    if vietnam_completed_activities == 4:
-        explored_countries += 1
-    if hongkong_completed_activities == 4:
-        explored_countries += 1
+    # Countries count as explored once all 4 activities are completed (kept up to date by the store)
+    explored_countries = stats['completed_regions']
     
     # Show congratulations if all 3 countries are completed
     if explored_countries == 3:
@@ -283,8 +254,7 @@ def main():
         st.balloons()
         
         # Enhanced confetti and celebration effects
-        st.markdown("""
-            <script src="https://cdn.jsdelivr.net/npm/canvas-confetti@1.6.0/dist/confetti.browser.min.js"></script>
+        st.markdown(f"<script src=\"{vendor_url('confetti.js')}\"></script>" + """
             <script>
                 // Multiple confetti effects for celebration
                 var duration = 5 * 1000;
@@ -459,22 +429,14 @@ def main():
     # Countries Section
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Get paths to map images
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(base_dir)
-    assets_dir = os.path.join(project_root, "assets", "map")
-    
-    cn_map_path = os.path.join(assets_dir, "China.png")
-    vn_map_path = os.path.join(assets_dir, "Vietnam.png")
-    hk_map_path = os.path.join(assets_dir, "Hong Kong.png")
-    
     # Create 3 columns for countries
     col1, col2, col3 = st.columns(3)
     
     with col1:
         # Vietnam Card
-        vietnam_stars = stats.get('vietnam_stars', 0)
-        vn_img_base64 = get_image_base64(vn_map_path) if os.path.exists(vn_map_path) else None
+        vietnam_stars = stats['region_totals'].get('Vietnam', 0)
+        # Inline placeholder first, card-sized copy once visible (see utils/asset_urls.py)
+        vn_img_html = lazy_image_html("map/Vietnam", alt="Vietnam Map")
         
         st.markdown(f"""
             <div style="background: white; border-radius: 15px; box-shadow: 0 8px 25px rgba(0,0,0,0.1); padding: 1rem; margin-bottom: 0.5rem; min-height: 280px;">
@@ -488,7 +450,7 @@ def main():
                 </div>
                 <!-- Map image -->
                 <div style="text-align: center; padding: 0.5rem 0;">
-                    {'<img src="data:image/png;base64,' + vn_img_base64 + '" style="width: 240px; max-width: 100%;" />' if vn_img_base64 else '<div style="height: 150px; display: flex; align-items: center; justify-content: center; background: #f0f0f0; border-radius: 10px;">Vietnam Map</div>'}
+                    {vn_img_html if vn_img_html else '<div style="height: 150px; display: flex; align-items: center; justify-content: center; background: #f0f0f0; border-radius: 10px;">Vietnam Map</div>'}
                 </div>
             </div>
         """, unsafe_allow_html=True)
@@ -499,8 +461,9 @@ def main():
     
     with col2:
         # China Card
-        china_stars = stats.get('china_stars', 0)
-        cn_img_base64 = get_image_base64(cn_map_path) if os.path.exists(cn_map_path) else None
+        china_stars = stats['region_totals'].get('China', 0)
+        # Inline placeholder first, card-sized copy once visible (see utils/asset_urls.py)
+        cn_img_html = lazy_image_html("map/China", alt="China Map")
         
         st.markdown(f"""
             <div style="background: white; border-radius: 15px; box-shadow: 0 8px 25px rgba(0,0,0,0.1); padding: 1rem; margin-bottom: 0.5rem; min-height: 280px;">
@@ -514,7 +477,7 @@ def main():
                 </div>
                 <!-- Map image -->
                 <div style="text-align: center; padding: 0.5rem 0;">
-                    {'<img src="data:image/png;base64,' + cn_img_base64 + '" style="width: 240px; max-width: 100%;" />' if cn_img_base64 else '<div style="height: 150px; display: flex; align-items: center; justify-content: center; background: #f0f0f0; border-radius: 10px;">China Map</div>'}
+                    {cn_img_html if cn_img_html else '<div style="height: 150px; display: flex; align-items: center; justify-content: center; background: #f0f0f0; border-radius: 10px;">China Map</div>'}
                 </div>
             </div>
         """, unsafe_allow_html=True)
@@ -525,8 +488,9 @@ def main():
     
     with col3:
         # Hong Kong Card
-        hongkong_stars = stats.get('hongkong_stars', 0)
-        hk_img_base64 = get_image_base64(hk_map_path) if os.path.exists(hk_map_path) else None
+        hongkong_stars = stats['region_totals'].get('Hong Kong', 0)
+        # Inline placeholder first, card-sized copy once visible (see utils/asset_urls.py)
+        hk_img_html = lazy_image_html("map/Hong Kong", alt="Hong Kong Map")
         
         st.markdown(f"""
             <div style="background: white; border-radius: 15px; box-shadow: 0 8px 25px rgba(0,0,0,0.1); padding: 1rem; margin-bottom: 0.5rem; min-height: 280px;">
@@ -540,7 +504,7 @@ def main():
                 </div>
                 <!-- Map image -->
                 <div style="text-align: center; padding: 0.5rem 0;">
-                    {'<img src="data:image/png;base64,' + hk_img_base64 + '" style="width: 240px; max-width: 100%;" />' if hk_img_base64 else '<div style="height: 150px; display: flex; align-items: center; justify-content: center; background: #f0f0f0; border-radius: 10px;">Hong Kong Map</div>'}
+                    {hk_img_html if hk_img_html else '<div style="height: 150px; display: flex; align-items: center; justify-content: center; background: #f0f0f0; border-radius: 10px;">Hong Kong Map</div>'}
                 </div>
             </div>
         """, unsafe_allow_html=True)
@@ -1,21 +1,21 @@
 import streamlit as st
 import sys
-import os
 from pathlib import Path
-import mimetypes
-import base64
-from PIL import Image
 
 # Add utils to path
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.star_manager import star_manager
+from utils.asset_urls import icon_url, lazy_image_html, vendor_url
+from utils.asset_pipeline import asset_variant
+from utils.asset_manifest import asset_path, asset_record
+from utils.thumbnails import thumbnail
 
 # Page icon logo (keep original logo.png for tab icon)
-page_logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "logo.png"
-logo_icon = str(page_logo_path) if page_logo_path.exists() else "🇭🇰"
+page_logo_path = asset_path("images/logo.png")
+logo_icon = str(page_logo_path) if page_logo_path else "🇭🇰"
 
 # Sidebar logo (use provided Cultoro.jpg)
-sidebar_logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "Cultoro.jpg"
+sidebar_logo_path = asset_path("images/Cultoro.jpg")
 
 st.set_page_config(
     page_title="Hong Kong - Culturo",
@@ -48,23 +48,11 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def load_icon(*keywords):
-    icon_dir = Path(__file__).parent.parent.parent / "assets" / "icons"
-    if not icon_dir.exists():
-        return ""
-    for f in icon_dir.iterdir():
-        name = f.name.lower()
-        if any(k in name for k in keywords):
-            data = f.read_bytes()
-            mime = mimetypes.guess_type(f.name)[0] or 'image/png'
-            b64 = base64.b64encode(data).decode()
-            return f"data:{mime};base64,{b64}"
-    return ""
-
-animals_icon = load_icon('pig','animal')
-language_icon = load_icon('translation','language','translate')
-arts_icon = load_icon('theater','art','mask')
-food_icon = load_icon('ramen','noodle','food')
+# Icons by URL where assets are served, else as cached data URIs (see utils/asset_urls.py)
+animals_icon = icon_url('pig','animal')
+language_icon = icon_url('translation','language','translate')
+arts_icon = icon_url('theater','art','mask')
+food_icon = icon_url('ramen','noodle','food')
 
 def hong_kong_page():
     if 'nav_counter' not in st.session_state:
@@ -72,7 +60,7 @@ def hong_kong_page():
 
     # Sidebar
     with st.sidebar:
-        if sidebar_logo_path.exists():
+        if sidebar_logo_path:
             st.image(str(sidebar_logo_path), width=200)
         else:
             st.markdown("""
@@ -99,7 +87,7 @@ def hong_kong_page():
     stars = star_manager.get_stars("Hong Kong")
     
     # Calculate completed activities
-    completed_activities = sum(1 for activity_stars in stars.values() if activity_stars > 0)
+    completed_activities = star_manager.get_completed_activities("Hong Kong")
     total_activities = len(stars)
 
     # Header
@@ -107,9 +95,9 @@ def hong_kong_page():
     with left:
         back_clicked = st.button("←\nBack", key="back_btn_hk", width='stretch')
     with middle:
-        st.markdown("""
+        st.markdown(f"""
             <div class="hk-header">
-                <img src="https://flagcdn.com/w80/hk.png" width="50" height="33" style="border-radius:3px;" />
+                <img src="{vendor_url('flags/hk.png')}" width="50" height="33" style="border-radius:3px;" />
                 <div style="display:flex; flex-direction:column;">
                     <h2 style="margin:0; padding:0; color:#E53935; font-size:1.6rem; font-weight:600; line-height:1;">Hong Kong</h2>
                     <p style="margin:0; padding:0; color:#666; font-size:0.9rem; line-height:1;">Choose an activity to explore!</p>
@@ -187,32 +175,24 @@ def hong_kong_page():
     with col_right:
         # Map similar to Vietnam page
         target_height = 520
-        map_path = Path(__file__).parent.parent.parent / "assets" / "pages" / "Hongkong_main.png"
-        chosen = None
-        if os.path.exists(map_path):
-            chosen = map_path
-        else:
-            for name in ["Hongkong.png", "Hong Kong.png", "hongkong_map.png"]:
-                alt = Path(__file__).parent.parent.parent / "assets" / "pages" / name
-                if os.path.exists(alt):
-                    chosen = alt
-                    break
-        if chosen:
-            try:
-                img = Image.open(chosen)
-                w, h = img.size
-                if h > target_height:
-                    new_w = int(w * (target_height / h))
-                    img = img.resize((new_w, target_height), Image.LANCZOS)
-                st.image(img, width="content")
-            except Exception:
-                st.image(str(chosen), width="content")
+        prebuilt = asset_variant("pages/HongKong_main")
+        if prebuilt:
+            # Display-sized variant from build_assets.py, lazily loaded over its inline placeholder
+            st.markdown(lazy_image_html("pages/HongKong_main", alt="Hong Kong Map"), unsafe_allow_html=True)
         else:
-            st.markdown("""
-                <div style="background:#f0f0f0; border-radius:15px; padding:3rem; text-align:center; min-height:400px; display:flex; align-items:center; justify-content:center;">
-                    <p style="color:#999;">Hong Kong Map</p>
-                </div>
-            """, unsafe_allow_html=True)
+            chosen = asset_record("pages/Hongkong_main.png", "pages/Hongkong.png", "pages/Hong Kong.png", "pages/hongkong_map.png")
+            if chosen:
+                try:
+                    # Resized once and cached on disk (see utils/thumbnails.py)
+                    st.image(thumbnail(chosen, max_height=target_height), width="content")
+                except Exception:
+                    st.image(str(chosen['path']), width="content")
+            else:
+                st.markdown("""
+                    <div style="background:#f0f0f0; border-radius:15px; padding:3rem; text-align:center; min-height:400px; display:flex; align-items:center; justify-content:center;">
+                        <p style="color:#999;">Hong Kong Map</p>
+                    </div>
+                """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     hong_kong_page()
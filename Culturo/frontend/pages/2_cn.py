@@ -1,18 +1,18 @@
 import streamlit as st
 import sys
-import os
 from pathlib import Path
-import mimetypes
-import base64
-from PIL import Image
 
 # Add utils to path
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.star_manager import star_manager
+from utils.asset_urls import icon_url, lazy_image_html, vendor_url
+from utils.asset_pipeline import asset_variant
+from utils.asset_manifest import asset_path, asset_record
+from utils.thumbnails import thumbnail
 
-logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "logo.png"
-logo_icon = str(logo_path) if logo_path.exists() else "🇨🇳"
-sidebar_logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "Cultoro.jpg"
+logo_path = asset_path("images/logo.png")
+logo_icon = str(logo_path) if logo_path else "🇨🇳"
+sidebar_logo_path = asset_path("images/Cultoro.jpg")
 
 st.set_page_config(
     page_title="China - Culturo",
@@ -44,30 +44,18 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def load_icon(*keywords):
-    icon_dir = Path(__file__).parent.parent.parent / "assets" / "icons"
-    if not icon_dir.exists():
-        return ""
-    for f in icon_dir.iterdir():
-        name = f.name.lower()
-        if any(k in name for k in keywords):
-            data = f.read_bytes()
-            mime = mimetypes.guess_type(f.name)[0] or 'image/png'
-            b64 = base64.b64encode(data).decode()
-            return f"data:{mime};base64,{b64}"
-    return ""
-
-animals_icon = load_icon('pig','animal')
-language_icon = load_icon('translation','language','translate')
-arts_icon = load_icon('theater','art','mask')
-food_icon = load_icon('ramen','noodle','food')
+# Icons by URL where assets are served, else as cached data URIs (see utils/asset_urls.py)
+animals_icon = icon_url('pig','animal')
+language_icon = icon_url('translation','language','translate')
+arts_icon = icon_url('theater','art','mask')
+food_icon = icon_url('ramen','noodle','food')
 
 def china_page():
     if 'nav_counter' not in st.session_state:
         st.session_state.nav_counter = 0
 
     with st.sidebar:
-        if sidebar_logo_path.exists():
+        if sidebar_logo_path:
             st.image(str(sidebar_logo_path), width=200)
         else:
             st.markdown("""
@@ -94,16 +82,16 @@ def china_page():
     stars = star_manager.get_stars("China")
     
     # Calculate completed activities
-    completed_activities = sum(1 for activity_stars in stars.values() if activity_stars > 0)
+    completed_activities = star_manager.get_completed_activities("China")
     total_activities = len(stars)
 
     header_left, header_middle, header_right = st.columns([0.1, 0.7, 0.2])
     with header_left:
         back_clicked = st.button("←\nBack", key="back_btn_cn", width='stretch')
     with header_middle:
-        st.markdown("""
+        st.markdown(f"""
             <div class="cn-header">
-                <img src="https://flagcdn.com/w80/cn.png" width="50" height="33" style="border-radius:3px;" />
+                <img src="{vendor_url('flags/cn.png')}" width="50" height="33" style="border-radius:3px;" />
                 <div style="display:flex; flex-direction:column;">
                     <h2 style="margin:0; padding:0; color:#E53935; font-size:1.6rem; font-weight:600; line-height:1;">China</h2>
                     <p style="margin:0; padding:0; color:#666; font-size:0.9rem; line-height:1;">Choose an activity to explore!</p>
@@ -160,30 +148,22 @@ def china_page():
                 st.session_state.current_region = "China"; st.switch_page("pages/6_food.py")
     with col_right:
         target_height = 520
-        map_path = Path(__file__).parent.parent.parent / "assets" / "pages" / "China_main.png"
-        chosen = None
-        if os.path.exists(map_path):
-            chosen = map_path
-        else:
-            for name in ["China.png", "china_map.png"]:
-                alt = Path(__file__).parent.parent.parent / "assets" / "pages" / name
-                if os.path.exists(alt):
-                    chosen = alt
-                    break
-        if chosen:
-            try:
-                img = Image.open(chosen)
-                w, h = img.size
-                if h > target_height:
-                    new_w = int(w * (target_height / h))
-                    img = img.resize((new_w, target_height), Image.LANCZOS)
-                st.image(img, width="content")
-            except Exception:
-                st.image(str(chosen), width="content")
+        prebuilt = asset_variant("pages/China_main")
+        if prebuilt:
+            # Display-sized variant from build_assets.py, lazily loaded over its inline placeholder
+            st.markdown(lazy_image_html("pages/China_main", alt="China Map"), unsafe_allow_html=True)
         else:
-            st.markdown("""
-                <div style=\"background:#f0f0f0; border-radius:15px; padding:3rem; text-align:center; min-height:400px; display:flex; align-items:center; justify-content:center;\">\n                    <p style=\"color:#999;\">China Map</p>\n                </div>
-            """, unsafe_allow_html=True)
+            chosen = asset_record("pages/China_main.png", "pages/China.png", "pages/china_map.png")
+            if chosen:
+                try:
+                    # Resized once and cached on disk (see utils/thumbnails.py)
+                    st.image(thumbnail(chosen, max_height=target_height), width="content")
+                except Exception:
+                    st.image(str(chosen['path']), width="content")
+            else:
+                st.markdown("""
+                    <div style=\"background:#f0f0f0; border-radius:15px; padding:3rem; text-align:center; min-height:400px; display:flex; align-items:center; justify-content:center;\">\n                    <p style=\"color:#999;\">China Map</p>\n                </div>
+                """, unsafe_allow_html=True)
     # Reinforce gradient override at end to ensure mint not applied from other pages
     st.markdown("""
         <style>
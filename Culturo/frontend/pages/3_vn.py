@@ -1,18 +1,18 @@
 import streamlit as st
 import sys
-import os
 from pathlib import Path
-import mimetypes
-import base64
-from PIL import Image
 
 # Add utils to path
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.star_manager import star_manager
+from utils.asset_urls import icon_url, lazy_image_html, vendor_url
+from utils.asset_pipeline import asset_variant
+from utils.asset_manifest import asset_path, asset_record
+from utils.thumbnails import thumbnail
 
 # Build absolute path to logo (reuse app logo like main_app)
-logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "logo.png"
-logo_icon = str(logo_path) if logo_path.exists() else "🇻🇳"  # fallback if missing
+logo_path = asset_path("images/logo.png")
+logo_icon = str(logo_path) if logo_path else "🇻🇳"  # fallback if missing
 
 # Page configuration (replace flag with logo)
 st.set_page_config(
@@ -24,8 +24,6 @@ st.set_page_config(
 
 # CSS styles
 st.markdown("""
-    <link rel='stylesheet' href='https://cdn-uicons.flaticon.com/2.6.0/uicons-regular-straight/css/uicons-regular-straight.css'>
-    <link rel='stylesheet' href='https://cdn-uicons.flaticon.com/2.6.0/uicons-regular-rounded/css/uicons-regular-rounded.css'>
     <style>
         /* Hide page navigation */
         [data-testid="stSidebarNav"] {
@@ -94,29 +92,17 @@ def vietnam_page():
     if 'nav_counter' not in st.session_state:
         st.session_state.nav_counter = 0
 
-    # Helper: load base64 data URI for icon by keywords
-    icon_dir = Path(__file__).parent.parent.parent / "assets" / "icons"
-    def load_icon(*keywords):
-        if not icon_dir.exists():
-            return ""
-        for f in icon_dir.iterdir():
-            name = f.name.lower()
-            if any(k in name for k in keywords):
-                data = f.read_bytes()
-                mime = mimetypes.guess_type(f.name)[0] or 'image/png'
-                b64 = base64.b64encode(data).decode()
-                return f"data:{mime};base64,{b64}"
-        return ""
-    animals_icon = load_icon('pig','animal')
-    language_icon = load_icon('translation','language','translate')
-    arts_icon = load_icon('theater','art','mask')
-    food_icon = load_icon('ramen','noodle','food')
+    # Icons by URL where assets are served, else as cached data URIs (see utils/asset_urls.py)
+    animals_icon = icon_url('pig','animal')
+    language_icon = icon_url('translation','language','translate')
+    arts_icon = icon_url('theater','art','mask')
+    food_icon = icon_url('ramen','noodle','food')
     
     # Sidebar content
     with st.sidebar:
         # Logo
-        logo_img_path = Path(__file__).parent.parent.parent / "assets" / "images" / "Cultoro.jpg"
-        if os.path.exists(logo_img_path):
+        logo_img_path = asset_path("images/Cultoro.jpg")
+        if logo_img_path:
             st.image(str(logo_img_path), width=200)
         else:
             st.markdown("""
@@ -147,7 +133,7 @@ def vietnam_page():
     total_stars = star_manager.get_total_stars("Vietnam")
     
     # Calculate completed activities (activities with stars > 0)
-    completed_activities = sum(1 for activity_stars in stars.values() if activity_stars > 0)
+    completed_activities = star_manager.get_completed_activities("Vietnam")
     total_activities = len(stars)
     
     # Header: Back button, flag/title, and progress counter
@@ -155,9 +141,9 @@ def vietnam_page():
     with header_left:
         back_clicked = st.button("←\nBack", key="back_btn", width='stretch')
     with header_middle:
-        st.markdown("""
+        st.markdown(f"""
             <div class="vn-header">
-                <img src="https://flagcdn.com/w80/vn.png" width="50" height="33" style="border-radius: 3px;" />
+                <img src="{vendor_url('flags/vn.png')}" width="50" height="33" style="border-radius: 3px;" />
                 <div style="display: flex; flex-direction: column;">
                     <h2 style="margin: 0; padding: 0; color: #E53935; font-size: 1.6rem; font-weight: 600; line-height: 1;">Viet Nam</h2>
                     <p style="margin: 0; padding: 0; color: #666; font-size: 0.9rem; line-height: 1;">Choose an activity to explore!</p>
@@ -262,32 +248,24 @@ def vietnam_page():
     with col_right:
         # Map image scaled to fit one page (reduce height to avoid scroll)
         target_height = 520  # adjust if still scrolling; reduce further if needed
-        map_path = Path(__file__).parent.parent.parent / "assets" / "pages" / "Vietnam_main.png"
-        chosen = None
-        if os.path.exists(map_path):
-            chosen = map_path
-        else:
-            for name in ["Vietnam.png", "vn.png", "vietnam_map.png"]:
-                alt_path = Path(__file__).parent.parent.parent / "assets" / "pages" / name
-                if os.path.exists(alt_path):
-                    chosen = alt_path
-                    break
-        if chosen:
-            try:
-                img = Image.open(chosen)
-                w, h = img.size
-                if h > target_height:
-                    new_w = int(w * (target_height / h))
-                    img = img.resize((new_w, target_height), Image.LANCZOS)
-                st.image(img, width="content")
-            except Exception:
-                st.image(str(chosen), width="content")
+        prebuilt = asset_variant("pages/Vietnam_main")
+        if prebuilt:
+            # Display-sized variant from build_assets.py, lazily loaded over its inline placeholder
+            st.markdown(lazy_image_html("pages/Vietnam_main", alt="Vietnam Map"), unsafe_allow_html=True)
         else:
-            st.markdown("""
-                <div style="background: #f0f0f0; border-radius: 15px; padding: 3rem; text-align: center; min-height: 400px; display: flex; align-items: center; justify-content: center;">
-                    <p style="color: #999;">Vietnam Map</p>
-                </div>
-            """, unsafe_allow_html=True)
+            chosen = asset_record("pages/Vietnam_main.png", "pages/Vietnam.png", "pages/vn.png", "pages/vietnam_map.png")
+            if chosen:
+                try:
+                    # Resized once and cached on disk (see utils/thumbnails.py)
+                    st.image(thumbnail(chosen, max_height=target_height), width="content")
+                except Exception:
+                    st.image(str(chosen['path']), width="content")
+            else:
+                st.markdown("""
+                    <div style="background: #f0f0f0; border-radius: 15px; padding: 3rem; text-align: center; min-height: 400px; display: flex; align-items: center; justify-content: center;">
+                        <p style="color: #999;">Vietnam Map</p>
+                    </div>
+                """, unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
 
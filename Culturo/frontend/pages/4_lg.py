@@ -8,11 +8,13 @@ current_dir = Path(__file__).parent
 frontend_dir = current_dir.parent
 sys.path.append(str(frontend_dir))
 
+from utils.asset_manifest import asset_path
+from utils.asset_urls import media_url, vendor_url
 from utils.star_manager import star_manager
 
 # Build absolute path to logo
-logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "logo.png"
-logo_icon = str(logo_path) if logo_path.exists() else "🗣️"
+logo_path = asset_path("images/logo.png")
+logo_icon = str(logo_path) if logo_path else "🗣️"
 
 # Page configuration
 st.set_page_config(
@@ -134,30 +136,25 @@ def get_listening_quiz_options(region):
 
 def get_audio_file_path(audio_filename):
     """Get the full path of audio file"""
-    project_root = Path(__file__).parent.parent.parent
-    audio_path = project_root / "assets" / "languages" / audio_filename
-    return audio_path if audio_path.exists() else None
+    return asset_path(f"languages/{audio_filename}")
 
 def get_region_image_path(region):
     """Get the image path for the region"""
-    project_root = Path(__file__).parent.parent.parent
     image_files = {
         'Hong Kong': 'hk_lg.png',
         'China': 'cn_lg.png',
         'Vietnam': 'vn_lg.png'
     }
     image_filename = image_files.get(region, 'hk_lg.png')
-    image_path = project_root / "assets" / "languages" / "image" / image_filename
-    return image_path if image_path.exists() else None
+    return asset_path(f"languages/image/{image_filename}")
 
 def play_audio(audio_filename):
     """Play audio file"""
     audio_path = get_audio_file_path(audio_filename)
-    if audio_path and audio_path.exists():
+    if audio_path:
         try:
-            with open(audio_path, "rb") as audio_file:
-                audio_bytes = audio_file.read()
-            st.audio(audio_bytes, format="audio/mp3")
+            # By URL (or path), so sessions do not each hold a copy of the clip
+            st.audio(media_url(audio_path), format="audio/mp3")
             return True
         except Exception as e:
             st.error(f"Failed to play audio: {e}")
@@ -184,7 +181,7 @@ def display_progress():
     
     with col1:
         hk_stars = all_stars.get('Hong Kong', {})
-        hk_total = sum(hk_stars.values())
+        hk_total = stats['region_totals'].get('Hong Kong', 0)
         st.markdown(f"#### 🇭🇰 Hong Kong: {hk_total}/12")
         for activity, stars in hk_stars.items():
             stars_display = "⭐" * stars + "☆" * (3 - stars)
@@ -192,7 +189,7 @@ def display_progress():
     
     with col2:
         cn_stars = all_stars.get('China', {})
-        cn_total = sum(cn_stars.values())
+        cn_total = stats['region_totals'].get('China', 0)
         st.markdown(f"#### 🇨🇳 China: {cn_total}/12")
         for activity, stars in cn_stars.items():
             stars_display = "⭐" * stars + "☆" * (3 - stars)
@@ -200,7 +197,7 @@ def display_progress():
     
     with col3:
         vn_stars = all_stars.get('Vietnam', {})
-        vn_total = sum(vn_stars.values())
+        vn_total = stats['region_totals'].get('Vietnam', 0)
         st.markdown(f"#### 🇻🇳 Vietnam: {vn_total}/12")
         for activity, stars in vn_stars.items():
             stars_display = "⭐" * stars + "☆" * (3 - stars)
@@ -233,7 +230,7 @@ def main():
     lang_data = get_region_language_data(current_region)
     
     # Get current stars for language activity
-    current_stars = star_manager.get_stars(current_region).get('Language', 0)
+    current_stars = star_manager.shown_stars(current_region, 'Language')
     
     # Header: Back button, title, and stars in the same row
     header_left, header_middle, header_right = st.columns([0.1, 0.75, 0.15])
@@ -242,9 +239,9 @@ def main():
     with header_middle:
         # Get flag URL based on region
         flag_urls = {
-            'Vietnam': 'https://flagcdn.com/w80/vn.png',
-            'China': 'https://flagcdn.com/w80/cn.png',
-            'Hong Kong': 'https://flagcdn.com/w80/hk.png'
+            'Vietnam': vendor_url('flags/vn.png'),
+            'China': vendor_url('flags/cn.png'),
+            'Hong Kong': vendor_url('flags/hk.png')
         }
         flag_url = flag_urls.get(current_region, '')
         
@@ -295,7 +292,7 @@ def main():
     with left_col:
         # Display region image only, no box or text
         region_image_path = get_region_image_path(current_region)
-        if region_image_path and region_image_path.exists():
+        if region_image_path:
             st.image(str(region_image_path), width='stretch')
     
     with right_col:
@@ -308,11 +305,9 @@ def main():
         
         # Display audio player
         audio_path = get_audio_file_path(lang_data['welcome_audio'])
-        if audio_path and audio_path.exists():
+        if audio_path:
             try:
-                with open(audio_path, "rb") as audio_file:
-                    audio_bytes = audio_file.read()
-                st.audio(audio_bytes, format="audio/mp3")
+                st.audio(media_url(audio_path), format="audio/mp3")
             except Exception as e:
                 st.error(f"Failed to load audio: {e}")
         else:
@@ -362,16 +357,12 @@ def main():
             # Handle form submission
             if submitted:
                 if user_answer:
-                    st.session_state.user_answer = user_answer
-                    st.session_state.language_submitted = True
-                    
                     # Check if answer is correct
-                    if user_answer == lang_data['correct_answer']:
-                        st.session_state.language_stars = 3
-                        star_manager.update_stars(current_region, 'Language', 3)
-                    else:
-                        st.session_state.language_stars = 0
-                        star_manager.update_stars(current_region, 'Language', 0)
+                    stars = 3 if user_answer == lang_data['correct_answer'] else 0
+                    if star_manager.save_result(current_region, 'Language', stars):
+                        st.session_state.user_answer = user_answer
+                        st.session_state.language_submitted = True
+                        st.session_state.language_stars = stars
                     
                     st.rerun()
                 else:
@@ -443,9 +434,9 @@ def main():
                     st.rerun()
     
     # Sidebar
-    logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "Cultoro.jpg"
+    logo_path = asset_path("images/Cultoro.jpg")
     with st.sidebar:
-        if logo_path.exists():
+        if logo_path:
             st.image(str(logo_path), width=200)
         else:
             st.markdown(
@@ -1,12 +1,12 @@
 import streamlit as st
-import os
-import base64
 import sys
 from pathlib import Path
 
 # Add utils to path
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.star_manager import star_manager
+from utils.asset_urls import asset_url, vendor_url
+from utils.asset_manifest import asset_path
 
 st.set_page_config(page_title="painting", layout="wide")
 
@@ -51,39 +51,24 @@ def get_current_region():
     # Get current region directly from session state
     return st.session_state.get('current_region', 'Hong Kong')
 
-def get_image_base64(image_path):
-    """Convert image to base64 encoding"""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception:
-        return None
-
 def get_region_image(region):
     """Get corresponding reference image based on region"""
-    base_dir = os.path.dirname(__file__)
-    assets_dir = os.path.join(base_dir, '..', '..', 'assets', 'images')
-    
     # Define image filenames corresponding to each region
     region_images = {
-        'Hong Kong': 'hk_pic.png',
-        'China': 'cn_pic.png', 
-        'Vietnam': 'vn_pic.png'
+        'Hong Kong': 'images/hk_pic.png',
+        'China': 'images/cn_pic.png', 
+        'Vietnam': 'images/vn_pic.png'
     }
     
     image_file = region_images.get(region)
-    if image_file:
-        image_path = os.path.join(assets_dir, image_file)
-        if os.path.exists(image_path):
-            return image_path
-    
-    # If specific image not found, return default image or None
-    return None
+    # The manifest matches names case-insensitively (the files are .PNG)
+    image_path = asset_path(image_file) if image_file else None
+    return str(image_path) if image_path else None
 
 def display_drawing_interface(region):
     """Display drawing interface"""
     # Get current stars for drawing activity
-    current_stars = star_manager.get_stars(region).get('Draw Animals', 0)
+    current_stars = star_manager.shown_stars(region, 'Draw Animals')
     
     # Header: Back button, title, and stars in the same row
     header_left, header_middle, header_right = st.columns([0.1, 0.75, 0.15])
@@ -92,9 +77,9 @@ def display_drawing_interface(region):
     with header_middle:
         # Get flag URL based on region
         flag_urls = {
-            'Vietnam': 'https://flagcdn.com/w80/vn.png',
-            'China': 'https://flagcdn.com/w80/cn.png',
-            'Hong Kong': 'https://flagcdn.com/w80/hk.png'
+            'Vietnam': vendor_url('flags/vn.png'),
+            'China': vendor_url('flags/cn.png'),
+            'Hong Kong': vendor_url('flags/hk.png')
         }
         flag_url = flag_urls.get(region, '')
         
@@ -160,13 +145,13 @@ def display_drawing_interface(region):
         </div>
         """, unsafe_allow_html=True)
         
-        if reference_image_path and os.path.exists(reference_image_path):
+        if reference_image_path:
             # Move image inside the visual container using custom HTML
-            img_base64 = get_image_base64(reference_image_path)
-            if img_base64:
+            img_uri = asset_url(reference_image_path)
+            if img_uri:
                 st.markdown(f"""
                 <div style="background: white; padding: 0 14px 6px 14px; border-radius: 10px; border: 1px solid #E0E0E0; margin-top: -10px; margin-bottom: 8px;">
-                    <img src="data:image/png;base64,{img_base64}" style="width: 100%; max-height: 250px; object-fit: contain; border-radius: 8px;">
+                    <img src="{img_uri}" style="width: 100%; max-height: 250px; object-fit: contain; border-radius: 8px;">
                 </div>
                 """, unsafe_allow_html=True)
             else:
@@ -190,8 +175,8 @@ def display_drawing_interface(region):
         if st.session_state[f'drawing_completed_{region}']:
             st.success("🎉 Completed! You earned 3 stars!")
             if st.button("🔄 Reset Drawing", width='stretch', key="reset_left"):
-                st.session_state[f'drawing_completed_{region}'] = False
-                star_manager.update_stars(region, 'Draw Animals', 0)
+                if star_manager.save_result(region, 'Draw Animals', 0):
+                    st.session_state[f'drawing_completed_{region}'] = False
                 st.rerun()
         else:
             st.markdown("""
@@ -206,10 +191,10 @@ def display_drawing_interface(region):
             </style>
             """, unsafe_allow_html=True)
             if st.button("🖌️ Submit Drawing", type="primary", width='stretch', key="submit_left"):
-                # Mark as completed and award stars
-                st.session_state[f'drawing_completed_{region}'] = True
-                st.session_state[f'show_balloons_{region}'] = True
-                star_manager.update_stars(region, 'Draw Animals', 3)
+                # Award stars, then mark as completed
+                if star_manager.save_result(region, 'Draw Animals', 3):
+                    st.session_state[f'drawing_completed_{region}'] = True
+                    st.session_state[f'show_balloons_{region}'] = True
                 st.rerun()
     
     with right_col:
@@ -417,9 +402,9 @@ def main():
     current_region = get_current_region()
     
     # Sidebar unified with country pages
-    logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "Cultoro.jpg"
+    logo_path = asset_path("images/Cultoro.jpg")
     with st.sidebar:
-      if logo_path.exists():
+      if logo_path:
         st.image(str(logo_path), width=200)
       else:
         st.markdown(
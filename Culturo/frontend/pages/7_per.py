@@ -1,5 +1,4 @@
 import streamlit as st
-import os
 from pathlib import Path
 import sys
 
@@ -9,6 +8,8 @@ frontend_dir = current_dir.parent
 sys.path.append(str(frontend_dir))
 
 from utils.star_manager import star_manager
+from utils.asset_manifest import asset_path
+from utils.asset_urls import media_url, vendor_url
 
 # Build absolute path to logo
 logo_path = Path(__file__).parent.parent.parent / "assets" / "images" / "Cultoro.jpg"
@@ -176,12 +177,8 @@ def get_region_video(region):
     video_filename = region_video_mapping.get(region)
     
     if video_filename:
-        # Use relative path from project root directory
-        project_root = Path(__file__).parent.parent.parent
-        video_path = project_root / "assets" / "videos" / video_filename
-        
-        if video_path.exists():
-            return str(video_path)
+        # Served by URL in byte ranges when the API server is configured (see utils/asset_urls.py)
+        return media_url(asset_path(f"videos/{video_filename}"))
     
     return None
 
@@ -325,7 +322,7 @@ def display_progress():
     
     with col1:
         hk_stars = all_stars.get('Hong Kong', {})
-        hk_total = sum(hk_stars.values())
+        hk_total = stats['region_totals'].get('Hong Kong', 0)
         st.markdown(f"#### 🇭🇰 Hong Kong: {hk_total}/12")
         for activity, stars in hk_stars.items():
             stars_display = "⭐" * stars + "☆" * (3 - stars)
@@ -333,7 +330,7 @@ def display_progress():
     
     with col2:
         cn_stars = all_stars.get('China', {})
-        cn_total = sum(cn_stars.values())
+        cn_total = stats['region_totals'].get('China', 0)
         st.markdown(f"#### 🇨🇳 China: {cn_total}/12")
         for activity, stars in cn_stars.items():
             stars_display = "⭐" * stars + "☆" * (3 - stars)
@@ -341,7 +338,7 @@ def display_progress():
     
     with col3:
         vn_stars = all_stars.get('Vietnam', {})
-        vn_total = sum(vn_stars.values())
+        vn_total = stats['region_totals'].get('Vietnam', 0)
         st.markdown(f"#### 🇻🇳 Vietnam: {vn_total}/12")
         for activity, stars in vn_stars.items():
             stars_display = "⭐" * stars + "☆" * (3 - stars)
@@ -372,7 +369,7 @@ def main():
     initialize_quiz()
     
     # Get current stars for performance activity
-    current_stars = star_manager.get_stars(current_region).get('Performance', 0)
+    current_stars = star_manager.shown_stars(current_region, 'Performance')
     
     # Header: Back button, title, and stars in the same row
     header_left, header_middle, header_right = st.columns([0.1, 0.75, 0.15])
@@ -381,9 +378,9 @@ def main():
     with header_middle:
         # Get flag URL based on region
         flag_urls = {
-            'Vietnam': 'https://flagcdn.com/w80/vn.png',
-            'China': 'https://flagcdn.com/w80/cn.png',
-            'Hong Kong': 'https://flagcdn.com/w80/hk.png'
+            'Vietnam': vendor_url('flags/vn.png'),
+            'China': vendor_url('flags/cn.png'),
+            'Hong Kong': vendor_url('flags/hk.png')
         }
         flag_url = flag_urls.get(current_region, '')
         
@@ -445,7 +442,7 @@ def main():
         # Get the correct video for the current region
         video_path = get_region_video(current_region)
         
-        if video_path and os.path.exists(video_path):
+        if video_path:
             try:
                 st.video(video_path)
                 st.markdown("<p style='text-align: center; color: #666; font-size: 0.9rem; margin-top: 0.5rem;'>Click play to watch the video</p>", unsafe_allow_html=True)
@@ -528,11 +525,10 @@ def main():
                                     if st.session_state.per_quiz_answers[i] == quiz_q["correct_answer"]:
                                         score += 1
                                 
-                                st.session_state.per_quiz_score = score
-                                st.session_state.per_quiz_submitted = True
-                                
                                 # Save stars using star_manager
-                                star_manager.update_stars(current_region, 'Performance', score)
+                                if star_manager.save_result(current_region, 'Performance', score):
+                                    st.session_state.per_quiz_score = score
+                                    st.session_state.per_quiz_submitted = True
                                 
                                 st.rerun()
         
@@ -0,0 +1,98 @@
+# frontend/utils/asset_cache.py
+"""Process-wide cache of images encoded as data URIs, shared by every page and session.
+
+Streamlit re-runs a page script on every click, but imported modules stay
+loaded, so encoding a file once here saves re-reading and re-encoding it on
+each run. Entries are keyed by (path, mtime), so an edited file is picked
+up on the next run, and the least recently used ones are dropped once the
+cache holds more than DATA_URI_CACHE_BYTES.
+"""
+import base64
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+ICON_DIR = Path(__file__).parent.parent.parent / "assets" / "icons"
+DATA_URI_CACHE_BYTES = int(os.environ.get("CULTURO_DATA_URI_CACHE_MB", "32")) * 1024 * 1024
+
+
+class DataUriCache:
+    """Size-bounded LRU of data URIs keyed by (path, mtime), with hit/miss counters"""
+
+    def __init__(self, max_bytes=DATA_URI_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Data URI of the file at path, or None if it cannot be read"""
+        path = str(path)
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+        with self._lock:
+            uri = self._entries.get(key)
+            if uri is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return uri
+            self.misses += 1
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        mime = mimetypes.guess_type(path)[0] or 'image/png'
+        uri = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+        with self._lock:
+            if key not in self._entries:
+                # Drop the entry of an older version of the same file
+                for old_key in [old for old in self._entries if old[0] == path]:
+                    self._bytes -= len(self._entries.pop(old_key))
+                self._entries[key] = uri
+                self._bytes += len(uri)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return uri
+
+    def stats(self):
+        """Counters for monitoring: hits, misses, entries and cached bytes"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._bytes}
+
+
+data_uri_cache = DataUriCache()
+_icon_listing = (None, [])
+
+
+def data_uri(path):
+    """Cached data URI of an image file, or None if it cannot be read"""
+    return data_uri_cache.get(path)
+
+
+def find_icon(*keywords):
+    """Path of the first icon in assets/icons whose name contains a keyword, or None
+
+    The directory listing is cached and re-read only when the directory changes.
+    """
+    global _icon_listing
+    try:
+        stamp = ICON_DIR.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _icon_listing[0] != stamp:
+        _icon_listing = (stamp, sorted(ICON_DIR.iterdir()))
+    for f in _icon_listing[1]:
+        name = f.name.lower()
+        if any(k in name for k in keywords):
+            return f
+    return None
@@ -0,0 +1,96 @@
+# frontend/utils/asset_manifest.py
+"""Manifest of every file under assets/, built once per process.
+
+Pages used to probe for files with chains of os.path.exists() over
+fallback names on every rerun. The manifest walks assets/ once, records
+each file's path, size, MIME type and (for images) dimensions, and
+answers lookups from a dict. Names are paths relative to assets/ and are
+matched case-insensitively, so "images/hk_pic.png" finds hk_pic.PNG on a
+case-sensitive filesystem too.
+
+Nothing is hashed while building it: the walk only stats files and reads
+image headers, so the first render does not read every video. A file's
+SHA-256 is computed when something first needs it, by
+backend.services.asset_service.content_digest (cached per file version).
+
+Files added while the app runs are only seen after refresh_manifest().
+"""
+import mimetypes
+import os
+import threading
+from pathlib import Path
+
+from utils.asset_pipeline import ASSETS_DIR
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def _image_size(path):
+    """(width, height) read from the image header, or (None, None) for non-images"""
+    try:
+        from PIL import Image
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+
+def _record(path, root):
+    mime = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    width, height = _image_size(path) if mime.startswith('image/') else (None, None)
+    return {
+        'name': path.relative_to(root).as_posix(),
+        'path': path,
+        'bytes': path.stat().st_size,
+        'mime': mime,
+        'width': width,
+        'height': height,
+    }
+
+
+def build_manifest(root=ASSETS_DIR):
+    """Walk root and return {lower-cased relative path: record}"""
+    root = Path(root)
+    manifest = {}
+    for directory, _, files in os.walk(root):
+        for filename in sorted(files):
+            if filename.startswith('.'):
+                continue
+            record = _record(Path(directory) / filename, root)
+            manifest.setdefault(record['name'].lower(), record)
+    return manifest
+
+
+def load_manifest():
+    """The process-wide manifest, built on first use"""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = build_manifest()
+    return _manifest
+
+
+def refresh_manifest():
+    """Rebuild the manifest, e.g. after adding files to assets/"""
+    global _manifest
+    with _manifest_lock:
+        _manifest = build_manifest()
+    return _manifest
+
+
+def asset_record(*names):
+    """Record of the first name that exists under assets/ (case-insensitive), or None"""
+    manifest = load_manifest()
+    for name in names:
+        record = manifest.get(name.lower())
+        if record:
+            return record
+    return None
+
+
+def asset_path(*names):
+    """Path of the first name that exists under assets/ (case-insensitive), or None"""
+    record = asset_record(*names)
+    return record['path'] if record else None
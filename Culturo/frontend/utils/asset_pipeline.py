@@ -0,0 +1,257 @@
+# frontend/utils/asset_pipeline.py
+"""Offline build of display-sized image variants, and lookup of the built files.
+
+The source PNGs under assets/ are several megabytes at up to 5760px. The
+build (python build_assets.py) writes each one at the size the pages show
+it (1x) and at twice that (2x), as a palette-quantised PNG and as WebP, into
+frontend/static/, plus a manifest.json describing every variant. Variant
+file names carry a digest of their content (china@2x.3f2a1b9c0d.png), so
+they can be served with long-lived cache headers. Each entry also carries
+a placeholder: a blurred copy a few hundred bytes long, as a data URI the
+pages inline while the full image loads. Pages ask for a variant by
+logical name and fall back to the source file when the build has not been
+run.
+
+The manifest is read once per process, and every lookup the pages make
+(which variant of which source, and whether its file exists) is resolved
+then, so a rerun answers from dicts without touching the filesystem. A
+build in another process is seen after a restart.
+"""
+import base64
+import io
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.services.asset_service import content_digest, data_digest
+from backend.utils.config import PROJECT_ROOT
+
+ASSETS_DIR = PROJECT_ROOT / "assets"
+STATIC_DIR = PROJECT_ROOT / "frontend" / "static"
+MANIFEST_PATH = STATIC_DIR / "manifest.json"
+
+# Logical name -> (source under assets/, (max width, max height) shown on the page at 1x)
+ASSETS = {
+    'icons/pig': ('icons/pig.png', (72, 72)),
+    'icons/ramen': ('icons/ramen.png', (72, 72)),
+    'icons/theater': ('icons/theater.png', (72, 72)),
+    'icons/translation': ('icons/translation.png', (72, 72)),
+    'map/China': ('map/China.png', (240, None)),
+    'map/Hong Kong': ('map/Hong Kong.png', (240, None)),
+    'map/Vietnam': ('map/Vietnam.png', (240, None)),
+    'pages/China_main': ('pages/China_main.png', (None, 520)),
+    'pages/HongKong_main': ('pages/HongKong_main.png', (None, 520)),
+    'pages/Vietnam_main': ('pages/Vietnam_main.png', (None, 520)),
+    # Drawing references: at most 250px high in a third of the page
+    'images/cn_pic': ('images/cn_pic.PNG', (400, 250)),
+    'images/hk_pic': ('images/hk_pic.PNG', (400, 250)),
+    'images/vn_pic': ('images/vn_pic.PNG', (400, 250)),
+}
+DENSITIES = (1, 2)
+WEBP_QUALITY = 82
+PLACEHOLDER_SIZE = 32
+PLACEHOLDER_QUALITY = 40
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def fit_size(size, box):
+    """Scale size down (never up) to fit box; a None side is unconstrained"""
+    width, height = size
+    scale = 1.0
+    if box[0]:
+        scale = min(scale, box[0] / width)
+    if box[1]:
+        scale = min(scale, box[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def slug(name):
+    """map/Hong Kong -> map/hong-kong"""
+    return '/'.join(re.sub(r'[^a-z0-9]+', '-', part.lower()).strip('-') for part in name.split('/'))
+
+
+def _source_stamp(path):
+    """Content hash of a source, so a fresh checkout of built files is not rebuilt"""
+    return {'sha256': content_digest(path, None), 'bytes': path.stat().st_size}
+
+
+def _save_hashed(image, base, fmt, output_dir, **options):
+    """Encode image and write it as <base>.<digest>.<fmt>; return its manifest record"""
+    buffer = io.BytesIO()
+    image.save(buffer, fmt.upper(), **options)
+    data = buffer.getvalue()
+    path = output_dir / f"{base}.{data_digest(data)}.{fmt}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return {'path': path.relative_to(output_dir).as_posix(), 'bytes': len(data)}
+
+
+def _write_variants(image, name, density, size, output_dir):
+    """Save one density of an image as palette PNG and WebP; return {format: variant}"""
+    from PIL import Image
+
+    # reducing_gap shrinks by whole factors first, so LANCZOS only runs near the target size
+    resized = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    base = f"{slug(name)}@{density}x"
+    # FASTOCTREE keeps the alpha channel when reducing to 256 colours
+    palette = resized.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    return {
+        'png': _save_hashed(palette, base, 'png', output_dir, optimize=True),
+        'webp': _save_hashed(resized, base, 'webp', output_dir, quality=WEBP_QUALITY, method=6),
+    }
+
+
+def placeholder_data_uri(image):
+    """Tiny blurred WebP of an RGBA image as a data URI.
+
+    It only keeps pixels whose whole area is (mostly) opaque in the image, so
+    once the full image loads on top of it, at most a faint half-pixel edge
+    of the placeholder shows around transparent parts.
+    """
+    from PIL import Image, ImageFilter
+
+    size = fit_size(image.size, (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    small = image.resize(size, Image.BOX, reducing_gap=3.0).filter(ImageFilter.GaussianBlur(1))
+    opaque = image.getchannel('A').point(lambda a: 255 if a >= 128 else 0)
+    small.putalpha(opaque.resize(size, Image.BOX).point(lambda a: 255 if a == 255 else 0))
+    buffer = io.BytesIO()
+    small.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+    return f"data:image/webp;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+def _variant_paths(entry):
+    return {variant[fmt]['path'] for variant in entry['variants'].values() for fmt in ('png', 'webp')}
+
+
+def build_asset(name, source, box, output_dir):
+    """Build every variant of one asset; return its manifest entry"""
+    from PIL import Image
+
+    with Image.open(source) as opened:
+        image = opened.convert('RGBA')
+    width, height = fit_size(image.size, box)
+    entry = {
+        'source': source.relative_to(PROJECT_ROOT).as_posix(),
+        'source_stamp': _source_stamp(source),
+        'width': width,
+        'height': height,
+        'placeholder': placeholder_data_uri(image),
+        'variants': {},
+    }
+    for density in DENSITIES:
+        size = fit_size(image.size, (width * density, height * density))
+        variants = _write_variants(image, name, density, size, output_dir)
+        entry['variants'][f'{density}x'] = {'width': size[0], 'height': size[1], **variants}
+    return entry
+
+
+def build_assets(output_dir=STATIC_DIR, force=False, log=print):
+    """Build the variants of every asset in ASSETS whose source changed; return the manifest"""
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / MANIFEST_PATH.name
+    try:
+        previous = json.loads(manifest_path.read_text(encoding='utf-8'))['assets']
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    assets = {}
+    for name, (relative, box) in ASSETS.items():
+        source = ASSETS_DIR / relative
+        if not source.exists():
+            log(f"   ⚠️  {relative} not found, skipped")
+            continue
+        old = previous.get(name)
+        if not force and old and 'placeholder' in old and old['source_stamp'] == _source_stamp(source) and all(
+                (output_dir / path).exists() for path in _variant_paths(old)):
+            assets[name] = old
+            continue
+        assets[name] = build_asset(name, source, box, output_dir)
+        if old:
+            for stale in _variant_paths(old) - _variant_paths(assets[name]):
+                (output_dir / stale).unlink(missing_ok=True)
+        smallest = min(variant[fmt]['bytes'] for variant in assets[name]['variants'].values() for fmt in ('png', 'webp'))
+        log(f"   ✅ {relative}: {source.stat().st_size // 1024} KB -> {smallest // 1024} KB at 1x")
+
+    manifest = {'version': 1, 'assets': assets}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+    if manifest_path == MANIFEST_PATH:
+        _set_index(manifest)
+    return manifest
+
+
+def _build_index(manifest):
+    """The manifest plus every lookup precomputed: {(name, density, fmt): path or None} and {source path: name}"""
+    variants = {}
+    sources = {}
+    for name, entry in manifest['assets'].items():
+        sources[str(PROJECT_ROOT / entry['source'])] = name
+        for density, formats in entry['variants'].items():
+            present = [formats[key] for key in ('png', 'webp') if key in formats]
+            if not present:
+                continue
+            for fmt in (None, 'png', 'webp'):
+                # Either the format asked for, or whichever of the two came out smaller
+                variant = formats[fmt] if fmt in formats else min(present, key=lambda candidate: candidate['bytes'])
+                path = STATIC_DIR / variant['path']
+                variants[(name, int(density.rstrip('x')), fmt)] = path if path.exists() else None
+    return {'manifest': manifest, 'variants': variants, 'sources': sources}
+
+
+def _set_index(manifest):
+    global _index
+    with _index_lock:
+        _index = _build_index(manifest)
+
+
+def _loaded():
+    """The index of the built manifest, read on first use"""
+    global _index
+    if _index is None:
+        try:
+            manifest = json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+        except OSError:
+            manifest = {'version': 1, 'assets': {}}
+        with _index_lock:
+            if _index is None:
+                _index = _build_index(manifest)
+    return _index
+
+
+def load_manifest():
+    """The built manifest, or an empty one if never built"""
+    return _loaded()['manifest']
+
+
+def asset_entry(name):
+    """Manifest entry of a logical asset, or None"""
+    return load_manifest()['assets'].get(name)
+
+
+def asset_variant(name, density=2, fmt=None):
+    """Path of a built variant, or None if it has not been built.
+
+    fmt is 'png' or 'webp'; by default whichever of the two came out smaller
+    (flat map art usually compresses better as a palette PNG).
+    """
+    return _loaded()['variants'].get((name, density, fmt))
+
+
+def variant_of_source(source, density=2, fmt='png'):
+    """Built variant of an original file under assets/ (e.g. the 2x PNG of a map), or None"""
+    sources = _loaded()['sources']
+    key = str(source)
+    if key not in sources:
+        # A path spelt differently (relative, through a symlink): resolve it once and remember the answer
+        try:
+            relative = Path(source).resolve().relative_to(PROJECT_ROOT.resolve()).as_posix()
+        except ValueError:
+            relative = None
+        sources[key] = sources.get(str(PROJECT_ROOT / relative)) if relative else None
+    name = sources[key]
+    return asset_variant(name, density, fmt) if name else None
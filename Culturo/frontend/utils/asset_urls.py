@@ -0,0 +1,162 @@
+# frontend/utils/asset_urls.py
+"""Reference images by URL so the browser can cache them, instead of inlining base64.
+
+asset_url() swaps an original image for its built 2x variant when there is
+one, then picks the first way of serving it that is available:
+
+1. CULTURO_ASSET_BASE_URL is set: the progress API (backend/api_server.py)
+   serves any file under assets/ or frontend/static/ by a content-hashed
+   name with immutable cache headers. start_app.py starts it and sets the
+   variable; with a plain `streamlit run`, both are up to you.
+2. Streamlit static serving is on (start_app.py turns it on): built files in
+   frontend/static/ are served at app/static/..., and their names already
+   carry a content digest (see utils/asset_pipeline.py).
+3. Otherwise a data URI from the shared cache (see utils/asset_cache.py).
+
+Which of these applies to a file is worked out on its first request and
+remembered for the life of the process (built and vendored files are named
+by their content, and the settings do not change while the app runs), so
+reruns look URLs up in a dict instead of checking files on every click.
+
+lazy_image_html() wraps an image in markup that shows its inline
+placeholder straight away and loads the full image once it is visible.
+
+vendor_url() and vendor_stylesheets_html() link the third-party files
+copied by vendor_assets.py (see utils/vendor_assets.py), falling back to
+their CDNs until they have been vendored. Vendored CSS and JS need the API
+server: Streamlit's static serving sends them as text/plain, which browsers
+refuse, so without it they are inlined.
+
+media_url() does the same for audio and video, which the API server sends
+in byte ranges from one shared copy; without it (CULTURO_ASSET_BASE_URL not
+set, e.g. a plain `streamlit run`), st.audio/st.video get the file path.
+"""
+import sys
+from html import escape
+from pathlib import Path
+from urllib.parse import quote
+
+import streamlit as st
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.services.asset_service import hashed_name
+from backend.utils.config import ASSET_BASE_URL
+from utils.asset_cache import data_uri, find_icon
+from utils.asset_pipeline import ASSETS, ASSETS_DIR, STATIC_DIR, asset_entry, variant_of_source
+from utils.vendor_assets import cdn_urls, vendored_path
+
+
+def _static_serving():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+# (kind, path) -> URL, or the Path to inline as a data URI, or None for a missing file.
+# Data URIs themselves are left to the size-bounded cache in utils/asset_cache.py.
+_urls = {}
+
+
+def _remembered(kind, path, resolve):
+    key = (kind, str(path))
+    if key not in _urls:
+        _urls[key] = resolve(Path(path))
+    url = _urls[key]
+    return data_uri(url) if isinstance(url, Path) else url
+
+
+def _resolve_asset_url(path):
+    if not path.is_file():
+        return None
+    # PNG rather than WebP: Streamlit's static serving only knows image MIME types for a few formats
+    path = variant_of_source(path, fmt='png') or path
+    if ASSET_BASE_URL:
+        try:
+            return f"{ASSET_BASE_URL}/{quote(hashed_name(path))}"
+        except ValueError:
+            pass  # outside the project
+    if _static_serving():
+        try:
+            relative = path.resolve().relative_to(STATIC_DIR.resolve())
+        except ValueError:
+            pass
+        else:
+            return f"app/static/{quote(relative.as_posix())}"
+    return path
+
+
+def asset_url(path):
+    """URL (or data URI as a last resort) for an image file; None if it does not exist"""
+    if path is None:
+        return None
+    return _remembered('asset', path, _resolve_asset_url)
+
+
+def lazy_image_html(name, alt=""):
+    """<img> markup for an asset in ASSETS, lazily loaded over its inline placeholder; empty if missing
+
+    Both images share one grid cell, so the full image covers the
+    placeholder as soon as it is decoded; the width and height attributes
+    reserve the space, so nothing shifts when it arrives.
+    """
+    relative, box = ASSETS[name]
+    url = asset_url(ASSETS_DIR / relative)
+    if not url:
+        return ""
+    entry = asset_entry(name)
+    image = f'src="{url}" alt="{escape(alt)}" loading="lazy" decoding="async"'
+    if not entry or not entry.get('placeholder'):
+        width = f"width: {box[0]}px; " if box[0] else ""
+        return f'<img {image} style="{width}max-width: 100%;" />'
+    size = f'width="{entry["width"]}" height="{entry["height"]}" style="grid-area: 1 / 1; width: 100%; height: auto;"'
+    return (f'<span style="display: inline-grid; width: {entry["width"]}px; max-width: 100%;">'
+            f'<img src="{entry["placeholder"]}" alt="" aria-hidden="true" {size} />'
+            f'<img {image} {size} /></span>')
+
+
+def _resolve_vendor_url(path):
+    # Not app/static/: Streamlit serves anything but images and media from there as text/plain
+    if ASSET_BASE_URL:
+        return f"{ASSET_BASE_URL}/{quote(hashed_name(path))}"
+    return path
+
+
+def vendor_url(name):
+    """URL of a vendored file such as "flags/hk.png" or "confetti.js", or its CDN address if not vendored"""
+    path = vendored_path(name)
+    if path is None:
+        # Not vendored (python vendor_assets.py --check lists what is missing): the original CDN
+        return cdn_urls(name)[0]
+    if path.suffix not in ('.css', '.js'):
+        return asset_url(path)
+    return _remembered('vendor', path, _resolve_vendor_url)
+
+
+def vendor_stylesheets_html(name="icons.css"):
+    """<link> tags for a vendored stylesheet, or for the CDN stylesheets it replaces"""
+    # Explicit CDN fallback: until vendor_assets.py has written the file, link every original stylesheet
+    urls = [vendor_url(name)] if vendored_path(name) else cdn_urls(name)
+    return "".join(f"<link rel='stylesheet' href='{url}'>" for url in urls)
+
+
+def _resolve_media_url(path):
+    if ASSET_BASE_URL:
+        try:
+            return f"{ASSET_BASE_URL}/{quote(hashed_name(path))}"
+        except (ValueError, OSError):
+            pass
+    return str(path)
+
+
+def media_url(path):
+    """URL of an audio or video file on the API server, or its path for st.audio/st.video"""
+    if path is None:
+        return None
+    return _remembered('media', path, _resolve_media_url)
+
+
+def icon_url(*keywords):
+    """URL of the first icon in assets/icons whose name contains a keyword, or an empty string"""
+    icon = find_icon(*keywords)
+    return (asset_url(icon) or "") if icon else ""
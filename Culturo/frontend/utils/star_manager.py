@@ -1,102 +1,145 @@
 # frontend/utils/star_manager.py
-"""Simple star management using JSON file storage - no API needed"""
-import json
+"""Star management for the Streamlit pages on top of the shared StarModel - no API needed"""
+import copy
+import sys
+import threading
 from pathlib import Path
 import streamlit as st
 
+# Make the shared backend package importable from the Streamlit pages
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.models.star_model import StarModel
+from backend.storage.base import canonical_activity
+from backend.utils.config import DEFAULT_LEARNER
+
+
+def get_learner_id():
+    """Identify the current learner: ?learner=... if given, else the browser session"""
+    learner = st.query_params.get("learner")
+    if learner:
+        return learner
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx else DEFAULT_LEARNER
+
+
 class StarManager:
-    """Manages star data using JSON file storage"""
+    """The current learner's stars, read and written through the shared StarModel.
+
+    One instance serves every Streamlit session, each running in its own
+    thread. Each session keeps its own working copy (a snapshot in
+    st.session_state) together with the store's learner_version() it was
+    read at, and reuses it only while the store still reports that version.
+    The default store (IndexedStore) checks the backend on every such call,
+    so writes from other sessions and, for SQLite and JSON, from other
+    processes show up on the next rerun.
+
+    Pages that compute new stars from the ones they showed read them with
+    shown_stars() and write with save_result(), which refuses the write if
+    the stored stars are no longer the ones the learner was looking at (the
+    same learner id open in another window or device changed them).
+    """
     
-    def __init__(self):
-        # Data file in project root
-        self.project_root = Path(__file__).parent.parent.parent
-        self.data_file = self.project_root / "data" / "stars.json"
-        self.data_file.parent.mkdir(exist_ok=True)
-        self._ensure_default_data()
+    SESSION_KEY = '_star_snapshot'
+    SHOWN_KEY = '_shown_stars'
+    CONFLICT_KEY = '_star_conflict'
+    CONFLICT_MESSAGE = "Your stars for this activity were changed in another window, so this result was not saved."
     
-    def _ensure_default_data(self):
-        """Ensure data file exists with default structure"""
-        if not self.data_file.exists():
-            default_data = {
-                'Hong Kong': {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-                'China': {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-                'Vietnam': {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-            }
-            self._save_data(default_data)
+    def __init__(self, store=None):
+        # SQLite by default; see backend/utils/config.py for the other backends
+        self.model = StarModel(store, report_error=st.error)
+        # Makes compare_and_set atomic against the other sessions of this process
+        self._write_lock = threading.Lock()
     
-    def _load_data(self):
-        """Load star data from JSON file"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            st.error(f"Failed to load star data: {e}")
-            return self._get_default_data()
+    def _snapshot(self):
+        """The current learner's snapshot, from this session's working copy while it is current"""
+        learner = get_learner_id()
+        # Version before data: a snapshot newer than its version only costs one extra read
+        version = self.model.learner_version(learner)
+        cached = st.session_state.get(self.SESSION_KEY)
+        if version is not None and cached and cached[0] == learner and cached[1] == version:
+            return cached[2]
+        snapshot = self.model.snapshot(learner)
+        if snapshot.complete and version is not None:
+            st.session_state[self.SESSION_KEY] = (learner, version, snapshot)
+        return snapshot
     
-    def _save_data(self, data):
-        """Save star data to JSON file"""
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            st.error(f"Failed to save star data: {e}")
-            return False
+    def update_stars(self, region, activity, stars):
+        """Update star count for a specific region and activity (clamped to 0-3)"""
+        learner = get_learner_id()
+        with self._write_lock:
+            return self.model.update_stars(region, activity, stars, learner=learner)
     
-    def _get_default_data(self):
-        """Get default data structure"""
-        return {
-            'Hong Kong': {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-            'China': {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0},
-            'Vietnam': {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-        }
+    def compare_and_set(self, region, activity, expected, stars):
+        """Set the star count only if it is still `expected`; return whether it was set.
+
+        The check reads the store, not the working copy, and no other session
+        of this process can write in between. A write from another process
+        landing between the check and the write is not detected.
+        """
+        learner = get_learner_id()
+        with self._write_lock:
+            current = self.model.snapshot(learner)
+            if not current.complete or current.get_stars(region).get(canonical_activity(activity), 0) != expected:
+                return False
+            return self.model.update_stars(region, activity, stars, learner=learner)
     
-    def update_stars(self, region, activity, stars):
-        """Update star count for a specific region and activity"""
-        data = self._load_data()
-        
-        # Ensure region exists
-        if region not in data:
-            data[region] = {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0}
-        
-        # Update star count
-        data[region][activity] = min(max(0, stars), 3)  # Clamp between 0-3
-        
-        success = self._save_data(data)
-        return success
+    def shown_stars(self, region, activity):
+        """Stars of an activity for this render; call once per run, before any save_result().
+
+        Remembers the value shown by the previous render too: a button click
+        reruns the page, and save_result() must compare against what the
+        learner saw when clicking, not what this run has just read.
+        """
+        stars = self.get_stars(region).get(canonical_activity(activity), 0)
+        shown = st.session_state.setdefault(self.SHOWN_KEY, {})
+        _, previous = shown.get((region, activity), (None, stars))
+        shown[(region, activity)] = (previous, stars)
+        # A refused save_result() of the previous run is reported here, after its st.rerun()
+        if st.session_state.pop(self.CONFLICT_KEY, None):
+            st.toast(self.CONFLICT_MESSAGE, icon="⚠️")
+        return stars
+    
+    def save_result(self, region, activity, stars):
+        """Save stars computed from what the learner was shown; False if they changed meanwhile.
+
+        On False nothing was written and the learner is warned on the next
+        render; the page should leave its own state as it was.
+        """
+        shown = st.session_state.get(self.SHOWN_KEY, {}).get((region, activity))
+        if shown is None:
+            raise RuntimeError(f"shown_stars({region!r}, {activity!r}) must run before save_result()")
+        if self.compare_and_set(region, activity, shown[0], stars):
+            return True
+        st.session_state[self.CONFLICT_KEY] = True
+        return False
     
     def get_stars(self, region=None):
         """Get star data for a specific region or all regions"""
-        data = self._load_data()
-        
-        if region:
-            return data.get(region, {'Language': 0, 'Draw Animals': 0, 'Food': 0, 'Performance': 0})
-        else:
-            return data
+        return copy.deepcopy(self._snapshot().get_stars(region))
     
     def get_total_stars(self, region=None):
         """Get total star count for a region or all regions"""
-        data = self._load_data()
-        
-        if region:
-            region_data = data.get(region, {})
-            return sum(region_data.values())
-        else:
-            total = 0
-            for region_data in data.values():
-                total += sum(region_data.values())
-            return total
+        return self._snapshot().get_total_stars(region)
+    
+    def get_completed_activities(self, region):
+        """Get the number of activities in a region with at least one star"""
+        return self._snapshot().get_completed_activities(region)
     
     def get_overall_stats(self):
         """Get overall statistics"""
-        data = self._load_data()
-        total_stars = sum(sum(region.values()) for region in data.values())
+        snapshot = self._snapshot()
         max_total_stars = 36  # 3 regions * 4 activities * 3 stars each
         
         return {
-            'all_stars': data,
-            'total_stars': total_stars,
-            'max_total_stars': max_total_stars
+            'all_stars': copy.deepcopy(snapshot.get_stars()),
+            'total_stars': snapshot.get_total_stars(),
+            'max_total_stars': max_total_stars,
+            'region_totals': {region: info['total'] for region, info in snapshot.summary['regions'].items()},
+            'completed_regions': snapshot.get_completed_regions()
         }
     
     def display_stars(self, count, max_stars=3):
@@ -106,4 +149,3 @@ class StarManager:
 
 # Create global instance
 star_manager = StarManager()
-
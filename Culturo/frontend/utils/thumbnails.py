@@ -0,0 +1,138 @@
+# frontend/utils/thumbnails.py
+"""Resized copies of asset images, cached on disk and in memory.
+
+The region pages used to open the full-resolution image and resize it
+with LANCZOS on every rerun, and st.image then re-encoded it. Here an
+image is resized once: the encoded result is written to .cache/thumbnails/
+under a name built from the source's SHA-256 (hashed once per file version),
+the target size and the format, so it survives restarts and is shared by
+every process. Recently used results are also kept in memory.
+"""
+import io
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.services.asset_service import content_digest
+from backend.utils.config import PROJECT_ROOT
+from utils.asset_pipeline import fit_size
+
+THUMBNAIL_DIR = Path(os.environ.get("CULTURO_THUMBNAIL_DIR", PROJECT_ROOT / ".cache" / "thumbnails"))
+THUMBNAIL_CACHE_BYTES = int(os.environ.get("CULTURO_THUMBNAIL_CACHE_MB", "16")) * 1024 * 1024
+FORMATS = {'png': 'PNG', 'webp': 'WEBP', 'jpeg': 'JPEG'}
+
+
+class ThumbnailCache:
+    """Size-bounded LRU of encoded thumbnails in front of the on-disk cache"""
+
+    def __init__(self, directory=THUMBNAIL_DIR, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, record, box, fmt='png'):
+        """Encoded bytes of a manifest record's image scaled down to fit box"""
+        if fmt not in FORMATS:
+            raise ValueError(f"unsupported thumbnail format: {fmt}")
+        if record['width'] is None:
+            raise ValueError(f"not an image: {record['name']}")
+        size = fit_size((record['width'], record['height']), box)
+        key = (content_digest(record['path'], None), size, fmt)
+        data = self._cached(key)
+        if data is not None:
+            return data
+
+        # One resize per image even when several sessions ask for it at once
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            data = self._cached(key, count=False)
+            if data is None:
+                data = self._load_or_resize(record, key)
+                self._store(key, data)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return data
+
+    def _cached(self, key, count=True):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+            return data
+
+    def _store(self, key, data):
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _path(self, key):
+        sha256, (width, height), fmt = key
+        return self.directory / f"{sha256[:16]}-{width}x{height}.{fmt}"
+
+    def _load_or_resize(self, record, key):
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            pass
+        else:
+            with self._lock:
+                self.disk_hits += 1
+            return data
+
+        with self._lock:
+            self.misses += 1
+        data = resize(record['path'], key[1], key[2])
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so another process never reads half a file
+            temp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp.write_bytes(data)
+            os.replace(temp, path)
+        except OSError:
+            pass  # read-only deployment: still served from memory
+        return data
+
+    def stats(self):
+        """Counters for monitoring: memory hits, disk hits, misses (resizes), entries and cached bytes"""
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._bytes}
+
+
+def resize(path, size, fmt='png'):
+    """Encode the image at path resized to size (width, height)"""
+    from PIL import Image
+
+    with Image.open(path) as opened:
+        image = opened.convert('RGB' if fmt == 'jpeg' else 'RGBA')
+    if image.size != tuple(size):
+        # reducing_gap shrinks by whole factors first, so LANCZOS only runs near the target size
+        image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    buffer = io.BytesIO()
+    image.save(buffer, FORMATS[fmt], optimize=True)
+    return buffer.getvalue()
+
+
+thumbnail_cache = ThumbnailCache()
+
+
+def thumbnail(record, max_width=None, max_height=None, fmt='png'):
+    """Encoded bytes of an asset (a record from utils.asset_manifest) scaled down to fit, never up"""
+    return thumbnail_cache.get(record, (max_width, max_height), fmt)
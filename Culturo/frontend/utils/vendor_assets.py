@@ -0,0 +1,221 @@
+# frontend/utils/vendor_assets.py
+"""Local, trimmed copies of the third-party CSS, fonts, scripts and flags the pages use.
+
+The pages used to load flaticon's icon font, flag-icons and canvas-confetti
+from CDNs and hot-link flag images from flagcdn.com, which costs DNS and
+TLS round-trips on every first visit and fails on networks that block
+those hosts. python vendor_assets.py (run once with internet access, and
+again when a version below changes) downloads the pinned versions and
+writes to frontend/static/vendor/:
+
+- icons.<digest>.css: the flaticon and flag-icons rules for the classes
+  in ICON_CLASSES only, with the icon font subset to those glyphs and
+  the flag SVGs inlined, so one small file replaces two stylesheets, a
+  font and the flag images they reference
+- confetti.<digest>.js and flags/<code>.<digest>.png as downloaded
+
+plus a manifest.json mapping each logical name to its file. The output is
+meant to be committed; python vendor_assets.py --check (run by
+start_app.py) reports what is missing. Until a file is vendored,
+vendor_url() returns its original CDN address.
+"""
+import base64
+import io
+import json
+import mimetypes
+import re
+import sys
+from pathlib import Path
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.services.asset_service import content_digest, data_digest
+from utils.asset_pipeline import STATIC_DIR
+
+VENDOR_DIR = STATIC_DIR / "vendor"
+VENDOR_MANIFEST_PATH = VENDOR_DIR / "manifest.json"
+
+FLAG_CODES = ('cn', 'hk', 'vn')
+# Classes used in the pages' markup; every other icon rule is dropped
+ICON_CLASSES = {'fi-rs-apps'} | {f'fi-{code}' for code in FLAG_CODES}
+
+# Logical name -> (CDN URL, prefix of the icon classes it defines, other classes the pages never use)
+# for each part of icons.css
+STYLESHEETS = {
+    'icons.css': [
+        ('https://cdn-uicons.flaticon.com/2.6.0/uicons-regular-straight/css/uicons-regular-straight.css', 'fi-rs-', set()),
+        ('https://cdn.jsdelivr.net/gh/lipis/flag-icons@7.0.0/css/flag-icons.min.css', 'fi-', {'fib', 'fis'}),
+    ],
+}
+# Logical name -> CDN URL of files vendored as they are
+FILES = {
+    'confetti.js': 'https://cdn.jsdelivr.net/npm/canvas-confetti@1.6.0/dist/confetti.browser.min.js',
+    **{f'flags/{code}.png': f'https://flagcdn.com/w80/{code}.png' for code in FLAG_CODES},
+}
+
+CSS_RULE = re.compile(r'(?P<selectors>[^{}]+)\{(?P<body>[^{}]*)\}')
+CSS_URL = re.compile(r'url\(\s*["\']?(?P<url>[^"\')]+)["\']?\s*\)')
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CLASS_NAME = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+GLYPH = re.compile(r'content:\s*["\']\\([0-9a-fA-F]+)["\']')
+
+_manifest = None
+_paths = None
+
+
+def fetch(url):
+    """Bytes at url (https:// or, for testing, file://)"""
+    with urlopen(Request(url, headers={'User-Agent': 'culturo-vendor'}), timeout=30) as response:
+        return response.read()
+
+
+def _data_uri(data, url):
+    mime = mimetypes.guess_type(url.split('?')[0])[0] or 'application/octet-stream'
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def _keep_selector(selector, prefix, used, unused):
+    """False if the selector styles a class of this stylesheet that the pages never use"""
+    return all(name not in unused and (name in used or not name.startswith(prefix))
+               for name in CLASS_NAME.findall(selector))
+
+
+def subset_font(data, codepoints):
+    """WOFF2 of a font reduced to the given code points (needs fonttools and brotli)"""
+    try:
+        from fontTools import subset
+    except ImportError:
+        raise RuntimeError("subsetting the icon font needs fonttools: pip install fonttools brotli")
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.notdef_outline = True
+    font = subset.load_font(io.BytesIO(data), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=sorted(codepoints))
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+def trim_stylesheet(css, base_url, prefix, unused=(), used=ICON_CLASSES, fetch=fetch):
+    """Rules of css that the pages need, with fonts subset and every url() inlined"""
+    css = CSS_COMMENT.sub('', css)
+    rules = []
+    font_faces = []
+    for match in CSS_RULE.finditer(css):
+        selectors = ' '.join(match.group('selectors').split())
+        body = ' '.join(match.group('body').split())
+        if selectors == '@font-face':
+            font_faces.append(body)
+            continue
+        kept = [selector for selector in selectors.split(',') if _keep_selector(selector.strip(), prefix, used, unused)]
+        if kept:
+            rules.append((','.join(selector.strip() for selector in kept), body))
+
+    def inline(body):
+        return CSS_URL.sub(lambda url: 'url("%s")' % _data_uri(fetch(urljoin(base_url, url.group('url'))),
+                                                             url.group('url')), body)
+
+    out = []
+    codepoints = {int(glyph, 16) for _, body in rules for glyph in GLYPH.findall(body)}
+    for body in font_faces:
+        # Keep the WOFF2 source only: every browser the app supports reads it
+        sources = [url for url in CSS_URL.findall(body) if url.split('?')[0].endswith('.woff2')]
+        if not sources or not codepoints:
+            continue
+        font = subset_font(fetch(urljoin(base_url, sources[0])), codepoints)
+        src = f'src: url("data:font/woff2;base64,{base64.b64encode(font).decode()}") format("woff2")'
+        declarations = [d.strip() for d in body.split(';') if d.strip() and not d.strip().startswith('src')]
+        out.append('@font-face{' + ';'.join(declarations + [src]) + '}')
+    out.extend(f'{selectors}{{{inline(body)}}}' for selectors, body in rules)
+    return '\n'.join(out) + '\n'
+
+
+def _write_hashed(data, name, output_dir):
+    """Write data as <stem>.<digest>.<suffix> under output_dir; return the path"""
+    stem, dot, suffix = name.rpartition('.')
+    path = output_dir / f"{stem}.{data_digest(data)}.{suffix}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def vendor_assets(output_dir=VENDOR_DIR, fetch=fetch, log=print):
+    """Download, trim and fingerprint every vendored file; return the manifest"""
+    output_dir = Path(output_dir)
+    try:
+        previous = json.loads((output_dir / VENDOR_MANIFEST_PATH.name).read_text(encoding='utf-8'))['files']
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    files = {}
+    for name, parts in STYLESHEETS.items():
+        css = ''.join(f"/* {url} (trimmed to the classes Culturo uses) */\n"
+                      + trim_stylesheet(fetch(url).decode('utf-8'), url, prefix, unused, fetch=fetch)
+                      for url, prefix, unused in parts)
+        files[name] = {'sources': [url for url, _, _ in parts], 'data': css.encode('utf-8')}
+    for name, url in FILES.items():
+        files[name] = {'sources': [url], 'data': fetch(url)}
+
+    manifest = {'version': 1, 'files': {}}
+    for name, entry in files.items():
+        path = _write_hashed(entry['data'], name, output_dir)
+        relative = path.relative_to(output_dir).as_posix()
+        manifest['files'][name] = {'path': relative, 'bytes': len(entry['data']), 'sources': entry['sources']}
+        old = previous.get(name)
+        if old and old['path'] != relative:
+            (output_dir / old['path']).unlink(missing_ok=True)
+        log(f"   ✅ {name}: {len(entry['data']) // 1024} KB")
+    (output_dir / VENDOR_MANIFEST_PATH.name).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    global _manifest
+    _manifest = None  # re-read on next use
+    return manifest
+
+
+def load_vendor_manifest():
+    """The vendor manifest, read once per process, or an empty one if never vendored"""
+    global _manifest, _paths
+    if _manifest is None:
+        try:
+            manifest = json.loads(VENDOR_MANIFEST_PATH.read_text(encoding='utf-8'))
+        except OSError:
+            manifest = {'version': 1, 'files': {}}
+        # Which vendored files exist is checked here once, not on every page run
+        _paths = {name: VENDOR_DIR / entry['path'] for name, entry in manifest['files'].items()
+                  if (VENDOR_DIR / entry['path']).exists()}
+        _manifest = manifest
+    return _manifest
+
+
+def vendored_path(name):
+    """Path of a vendored file, or None if it has not been vendored"""
+    load_vendor_manifest()
+    return _paths.get(name)
+
+
+def missing_vendored(output_dir=VENDOR_DIR):
+    """Problems that keep the pages on the CDNs: logical names not vendored, or files missing or altered"""
+    output_dir = Path(output_dir)
+    try:
+        files = json.loads((output_dir / VENDOR_MANIFEST_PATH.name).read_text(encoding='utf-8'))['files']
+    except (OSError, ValueError, KeyError):
+        return [f"{output_dir / VENDOR_MANIFEST_PATH.name} not found: run python vendor_assets.py"]
+    problems = []
+    for name in [*STYLESHEETS, *FILES]:
+        entry = files.get(name)
+        if not entry:
+            problems.append(f"{name} is not vendored")
+            continue
+        path = output_dir / entry['path']
+        if not path.is_file():
+            problems.append(f"{name}: {path} is missing")
+        elif path.name.split('.')[-2] != content_digest(path):
+            problems.append(f"{name}: {path} does not match the digest in its name")
+    return problems
+
+
+def cdn_urls(name):
+    """The original CDN addresses of a logical vendored name"""
+    return [url for url, _, _ in STYLESHEETS[name]] if name in STYLESHEETS else [FILES[name]]
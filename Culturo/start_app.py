@@ -12,7 +12,9 @@ import subprocess
 import sys
 import os
 import platform
+import time
 from pathlib import Path
+from urllib.request import urlopen
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -51,8 +53,74 @@ def setup_directories():
     # Always reset stars.json for fresh start every time
     stars_file = data_dir / "stars.json"
     stars_file.write_text('{}')
+    
+    # Same for the other progress backends (SQLite database, journal, snapshots and shards)
+    for pattern in ("progress.*", "progress-*", "stars-*.json"):
+        for path in data_dir.glob(pattern):
+            path.unlink()
     print("🔄 Reset progress data for fresh learning experience")
 
+def build_assets():
+    """Build display-sized image variants if any source image changed (see build_assets.py)"""
+    try:
+        sys.path.append(str(Path(__file__).parent / "frontend"))
+        from utils.asset_pipeline import build_assets as build
+        build(log=lambda message: None)
+        print("🖼️  Optimised images are up to date")
+    except Exception as e:
+        # Pages fall back to the original images
+        print(f"⚠️  Could not build optimised images: {e}")
+
+def check_vendored_assets():
+    """Report whether the third-party icons, flags and scripts are vendored (see vendor_assets.py)"""
+    try:
+        sys.path.append(str(Path(__file__).parent / "frontend"))
+        from utils.vendor_assets import missing_vendored
+        problems = missing_vendored()
+    except Exception as e:
+        problems = [str(e)]
+    if problems:
+        print(f"⚠️  Icons, flags and confetti load from their CDNs: {problems[0]}")
+    else:
+        print("📦 Icons, flags and confetti are served from frontend/static/vendor/")
+
+def start_asset_server():
+    """Start backend/api_server.py to serve audio/video, images and vendored CSS/JS by URL.
+
+    The pages then link files at content-hashed URLs with one-year cache
+    headers, the right Content-Type and HTTP Range support (audio/video
+    seeking), instead of handing Streamlit file paths or inlining them.
+    Vendored CSS/JS only come from it once vendor_assets.py has been run. Skipped when CULTURO_ASSET_BASE_URL
+    is already set, CULTURO_START_API_SERVER=0, or the storage backend
+    cannot be opened by two processes. Returns (process, base URL),
+    or (None, None) if the server is not used.
+    """
+    if os.environ.get("CULTURO_ASSET_BASE_URL") or os.environ.get("CULTURO_START_API_SERVER") == "0":
+        return None, None
+    from backend.utils import config
+    # The API server opens the progress store too: only backends several processes can share
+    if config.STORAGE_BACKEND not in ("sqlite", "json", "daemon"):
+        print(f"⚠️  Not starting the API server: the {config.STORAGE_BACKEND} backend is single-process; assets will be inlined")
+        return None, None
+    server_url = f"http://{config.API_HOST}:{config.API_PORT}"
+    log = open(Path(__file__).parent / "data" / "api_server.log", "w")
+    process = subprocess.Popen([sys.executable, str(Path(__file__).parent / "backend" / "api_server.py")],
+                               stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    # Wait until it answers, so the first page render already links it
+    for _ in range(50):
+        if process.poll() is not None:
+            break
+        try:
+            with urlopen(f"{server_url}/api/health", timeout=1):
+                print(f"📦 Assets served by the API server at {server_url}/assets")
+                return process, f"{server_url}/assets"
+        except OSError:
+            time.sleep(0.1)
+    print(f"⚠️  Could not start the API server on {server_url} (see data/api_server.log); assets will be inlined")
+    process.terminate()
+    return None, None
+
 def main():
     """Start the Streamlit application with enhanced setup"""
     print("\n" + "=" * 70)
@@ -74,6 +142,12 @@ def main():
     
     # Setup
     setup_directories()
+    build_assets()
+    check_vendored_assets()
+    asset_server, asset_base_url = start_asset_server()
+    env = dict(os.environ)
+    if asset_base_url:
+        env["CULTURO_ASSET_BASE_URL"] = asset_base_url
     
     # Application info
     print("\n🎯 Features Available:")
@@ -111,10 +185,12 @@ def main():
                 "--server.headless", "false",
                 "--browser.gatherUsageStats", "false",
                 "--server.fileWatcherType", "none",  # Reduce resource usage
+                "--server.enableStaticServing", "true",  # Serve frontend/static/ images by URL
                 "--theme.primaryColor", "#004DA0",    # Culturo blue theme
                 "--theme.backgroundColor", "#EFF8FF",  # Light blue background
             ],
             cwd=frontend_dir,
+            env=env,
             check=True
         )
     except KeyboardInterrupt:
@@ -146,6 +222,9 @@ def main():
         print("   • Check HOW_TO_RUN.md for detailed troubleshooting")
         print("   • Create an issue on GitHub with error details")
         sys.exit(1)
+    finally:
+        if asset_server is not None:
+            asset_server.terminate()
 
 if __name__ == "__main__":
     main()
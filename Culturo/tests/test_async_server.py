@@ -0,0 +1,49 @@
+"""The asyncio server answers a bad Content-Length with 400 instead of dropping the connection"""
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault('CULTURO_STORAGE', 'memory')
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.async_server import MAX_BODY, handle_connection
+
+
+async def _exchange(request):
+    server = await asyncio.start_server(handle_connection, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        await writer.wait_closed()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body) if body else None
+
+
+def _post(length):
+    return (f"POST /api/progress/reset HTTP/1.1\r\nHost: test\r\n"
+            f"Content-Length: {length}\r\n\r\n{{}}").encode('latin-1')
+
+
+@pytest.mark.parametrize('length', ['-5', 'abc', '+2', '1_0'])
+def test_invalid_content_length_is_rejected(length):
+    status, body = asyncio.run(_exchange(_post(length)))
+    assert status == 400
+    assert body == {'error': 'Invalid Content-Length'}
+
+
+def test_oversized_content_length_is_rejected():
+    status, _ = asyncio.run(_exchange(_post(MAX_BODY + 1)))
+    assert status == 413
+
+
+def test_overlong_header_line_is_rejected():
+    request = b"GET /api/health HTTP/1.1\r\nX-Filler: " + b"a" * (128 * 1024) + b"\r\n\r\n"
+    status, _ = asyncio.run(_exchange(request))
+    assert status == 400
@@ -0,0 +1,47 @@
+"""SQLiteStore keeps a bounded number of connections however many threads use it"""
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.storage.sqlite_store import SQLiteStore
+
+
+def _open_fds():
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+
+
+def test_short_lived_threads_reuse_pooled_connections(tmp_path):
+    store = SQLiteStore(tmp_path / 'progress.db', pool_size=4)
+    fds_before = _open_fds()
+
+    def work(index):
+        store.set_stars(f'learner-{index}', 'China', 'Food', index % 4)
+        store.get_learner(f'learner-{index}')
+
+    for batch in range(30):
+        threads = [threading.Thread(target=work, args=(batch * 10 + i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert store.open_connections() <= 4
+    if fds_before is not None:
+        # Each connection holds the database, WAL and shared-memory files
+        assert _open_fds() - fds_before <= 4 * 3
+    assert len(list(store.iter_records())) == 300
+    store.close()
+    assert store.open_connections() == 0
+
+
+def test_abandoned_scan_returns_its_connection(tmp_path):
+    store = SQLiteStore(tmp_path / 'progress.db', pool_size=1)
+    store.set_many([(f'learner-{i}', 'China', 'Food', 1) for i in range(10)])
+    records = store.iter_records()
+    next(records)
+    records.close()
+    # With a pool of one, this would wait for the connection the scan held
+    assert store.get_learner('learner-0') == {'China': {'Food': 1}}
+    store.close()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Culturo Vendored Assets
+
+Downloads the icon stylesheets, icon font, confetti script and flag images
+the pages use from CDNs, trims them to what the pages need and writes
+fingerprinted copies to frontend/static/vendor/. Run it once with
+internet access (and after changing a pinned version) and commit the
+result; the app then loads nothing from third-party hosts.
+
+Needs fonttools and brotli to subset the icon font: pip install fonttools brotli
+
+Usage: python vendor_assets.py           download and write the files
+       python vendor_assets.py --check   exit 1 if any file is missing (the pages then use the CDNs)
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "frontend"))
+from utils.vendor_assets import VENDOR_DIR, missing_vendored, vendor_assets
+
+
+def check():
+    problems = missing_vendored()
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        print("   The pages load these from their CDNs until python vendor_assets.py is run and its output committed")
+        sys.exit(1)
+    print(f"✅ Every vendored file is present in {VENDOR_DIR}")
+
+
+def main():
+    if "--check" in sys.argv[1:]:
+        check()
+        return
+    print("📦 Vendoring front-end dependencies...")
+    try:
+        manifest = vendor_assets()
+    except OSError as e:
+        print(f"❌ Download failed: {e}")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"   📄 {len(manifest['files'])} files in {VENDOR_DIR / 'manifest.json'}")
+
+
+if __name__ == "__main__":
+    main()